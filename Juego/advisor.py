@@ -0,0 +1,351 @@
+import math
+import queue
+import random
+import threading
+import time
+
+from engine import (SUSPECTS, WEAPONS, AREAS, AREA_IDS, SUSPECT_IDS, WEAPON_IDS, SUSPECT_KINDS,
+                    CLUE_KINDS, DECOY_CLUES, CLUES_PER_AREA_VISIT, CLUES_PER_LOOKUP, Clue, pack_clue)
+from solver import DeductionSolver
+from strategies import ACTIONS, detective_action
+
+# ========================
+# CONSEJERO DE MOVIMIENTOS
+# Ordena todas las acciones posibles (cada área, sospechoso y arma) según la probabilidad
+# esperada de acertar la acusación si se hace esa acción y después se sigue jugando como
+# el detective de referencia (detective_action) hasta agotar los turnos. Como desempate
+# usa la ganancia de información esperada de la propia acción.
+#
+# El consejero solo sabe lo que sabe el jugador: las pistas reveladas, cuántas se
+# retiraron de cada área, qué áreas se vaciaron y qué búsquedas no encontraron más.
+# Nunca lee el mazo real. La esperanza se calcula sobre casos completos sorteados entre
+# los compatibles con lo observado: la hipótesis (sospechoso, arma, lugar) sale de la
+# distribución de DeductionSolver y las pistas que faltan por ver, del mismo modelo con
+# el que generate_clues crea los casos. Cada caso sorteado se juega con todas las
+# acciones (números aleatorios comunes), así que las diferencias entre acciones no son
+# ruido del sorteo.
+#
+# Dentro de cada caso sorteado se memoiza el resultado por posición canónica (pistas
+# retiradas por área, pistas vistas, búsquedas y visitas hechas, turnos que quedan): las
+# jugadas que llegan a la misma posición por caminos distintos se evalúan una sola vez.
+# Los resultados se acumulan por situación (lo observado y los turnos que quedan):
+# pedir otra vez la misma situación sigue sumando casos en lugar de empezar de cero.
+# Cada llamada respeta un presupuesto de tiempo estricto (TIME_BUDGET).
+# ========================
+
+TIME_BUDGET = 0.05
+MAX_WORLDS = 400
+# Intentos de sorteo seguidos sin un caso compatible antes de dejarlo.
+MAX_TRIES = 200
+# Ids de las pistas sorteadas: no pueden coincidir con los de las pistas reales vistas.
+SAMPLED_ID = 1 << 20
+
+ACTION_IDS = [(kind, {"area": AREA_IDS, "suspect": SUSPECT_IDS, "weapon": WEAPON_IDS}[kind][name])
+              for kind, name in ACTIONS]
+
+def describe_action(action):
+    kind, name = action
+    if kind == "area":
+        return f"Investigar {name}"
+    if kind == "suspect":
+        return f"Investigar a {name}"
+    return f"Investigar el arma {name}"
+
+def entropy(probs):
+    return -sum(p * math.log2(p) for p in probs if p > 0.0)
+
+def solver_entropy(solver):
+    suspects, weapons, areas = solver.marginals()
+    return entropy(suspects) + entropy(weapons) + entropy(areas)
+
+class Belief:
+    # Copia inmutable de lo observado, para evaluarla en otro hilo mientras se sigue jugando.
+    def __init__(self, advisor):
+        self.solver = advisor.solver.copy()
+        self.taken = tuple(tuple(clues) for clues in advisor.taken)
+        self.seen = tuple(advisor.seen.values())
+        self.exhausted = frozenset(advisor.exhausted)
+        self.closed = frozenset(advisor.closed)
+        self.looked_up = frozenset(advisor.looked_up)
+        self.visited = frozenset(advisor.visited)
+        # Tuplas ordenadas: sirven de clave y su repr no depende del hash de las cadenas.
+        self.key = (tuple(tuple(c.id for c in clues) for clues in self.taken),
+                    tuple(sorted(advisor.seen)), tuple(sorted(self.exhausted)),
+                    tuple(sorted(self.closed)), tuple(sorted(self.looked_up)),
+                    tuple(sorted(self.visited)))
+
+class MoveAdvisor:
+    def __init__(self, decoys=DECOY_CLUES, clues_per_visit=CLUES_PER_AREA_VISIT, budget=TIME_BUDGET):
+        # Se crea uno por caso y recibe el resultado de cada acción con observe.
+        self.decoys = decoys
+        self.clues_per_visit = clues_per_visit
+        self.budget = budget
+        self.solver = DeductionSolver(decoy_clues=decoys)
+        self.taken = [[] for _ in AREAS]  # pistas retiradas de cada área, en orden
+        self.seen = {}                    # id -> pista revelada
+        self.exhausted = set()            # áreas que ya devolvieron menos pistas de las pedidas
+        self.closed = set()               # ("suspect"|"weapon", id) sin más pistas en el mazo
+        self.looked_up, self.visited = set(), set()
+        self._stats = {}
+
+    def observe(self, kind, name, revealed):
+        # Resultado de una acción del jugador (la misma interfaz que las estrategias).
+        for clue in revealed:
+            self.seen[clue.id] = clue
+        if kind == "area":
+            a = AREA_IDS[name]
+            self.visited.add(a)
+            self.taken[a].extend(revealed)
+            if len(revealed) < self.clues_per_visit:
+                self.exhausted.add(a)
+            for clue in revealed:
+                self.solver.observe(clue)
+            return
+        entity = (SUSPECT_IDS if kind == "suspect" else WEAPON_IDS)[name]
+        self.looked_up.add((kind, entity))
+        # La búsqueda devuelve las primeras pistas que quedan: si trae menos de las
+        # pedidas, en el mazo no queda ninguna otra que nombre a esa entidad.
+        if len(revealed) < CLUES_PER_LOOKUP:
+            self.closed.add((kind, entity))
+        self.solver.observe_lookup(kind == "suspect", entity, revealed)
+
+    def position(self):
+        return Belief(self)
+
+    # ========================
+    # CASOS COMPATIBLES CON LO OBSERVADO
+    # ========================
+
+    def _hypotheses(self, solver):
+        # Hipótesis posibles y pesos acumulados de P(s, w, a) ∝ S[s][a] · W[w][a].
+        cells, cum, total = [], [], 0.0
+        for a in range(len(AREAS)):
+            for s, srow in enumerate(solver.suspect_rows):
+                for w, wrow in enumerate(solver.weapon_rows):
+                    p = srow[a] * wrow[a]
+                    if p > 0.0:
+                        total += p
+                        cells.append((s, w, a))
+                        cum.append(total)
+        return cells, cum
+
+    def sample_world(self, belief, cells, cum, rng):
+        # Sortea un caso completo compatible con lo observado: (hipótesis, pistas que
+        # quedan en cada área), con las vistas por búsqueda y las aún sin ver en orden al
+        # azar. Devuelve None si lo sorteado contradice lo observado.
+        s, w, a = rng.choices(cells, cum_weights=cum)[0]
+        open_areas = [x for x in range(len(AREAS)) if x not in belief.exhausted]
+        suspect_area, have, seen_decoys = None, set(), 0
+        for clue in belief.seen:
+            if clue.kind in SUSPECT_KINDS:
+                if clue.entity != s:
+                    seen_decoys += 1
+                    continue
+                if clue.kind in have or clue.area == a or suspect_area not in (None, clue.area):
+                    return None
+                suspect_area = clue.area
+            else:
+                if clue.entity != w:
+                    seen_decoys += 1
+                    continue
+                if clue.kind in have or clue.area != a:
+                    return None
+            have.add(clue.kind)
+
+        codes = []
+        for kind in range(len(CLUE_KINDS)):
+            if kind in have:
+                continue
+            if kind in SUSPECT_KINDS:
+                if ("suspect", s) in belief.closed:
+                    return None
+                if suspect_area is None:
+                    options = [x for x in open_areas if x != a]
+                    if not options:
+                        return None
+                    suspect_area = rng.choice(options)
+                area, entity = suspect_area, s
+            else:
+                if ("weapon", w) in belief.closed:
+                    return None
+                area, entity = a, w
+            if area in belief.exhausted:
+                return None
+            codes.append(pack_clue(kind, area, True, entity))
+
+        n_decoys = self.decoys - seen_decoys
+        if n_decoys < 0:
+            return None
+        if n_decoys:
+            # Las falsas: tipo uniforme, entidad uniforme entre las que no son la real, y
+            # área uniforme; se descarta lo que lo observado ya excluye.
+            options, weights = [], []
+            for kind in range(len(CLUE_KINDS)):
+                is_suspect = kind in SUSPECT_KINDS
+                names, real = (SUSPECTS, s) if is_suspect else (WEAPONS, w)
+                for e in range(len(names)):
+                    if e != real and ("suspect" if is_suspect else "weapon", e) not in belief.closed:
+                        options.append((kind, e))
+                        weights.append(1.0 / (len(names) - 1))
+            if not options or not open_areas:
+                return None
+            for kind, e in rng.choices(options, weights, k=n_decoys):
+                codes.append(pack_clue(kind, rng.choice(open_areas), False, e))
+
+        remaining = [[] for _ in AREAS]
+        taken = {clue.id for clues in belief.taken for clue in clues}
+        for clue in belief.seen:
+            if clue.id not in taken:
+                remaining[clue.area].append(clue)
+        for i, code in enumerate(codes):
+            clue = Clue(SAMPLED_ID + i, code)
+            remaining[clue.area].append(clue)
+        for clues in remaining:
+            rng.shuffle(clues)
+        return (s, w, a), remaining
+
+    # ========================
+    # SIMULACIÓN
+    # Reproduce las reglas de ClueEngine sobre un caso sorteado.
+    # ========================
+
+    def _play(self, remaining, solver, looked_up, visited, kind, i):
+        if kind == "area":
+            visited.add(i)
+            revealed = remaining[i][:self.clues_per_visit]
+            del remaining[i][:self.clues_per_visit]
+            for clue in revealed:
+                solver.observe(clue)
+            return
+        looked_up.add((kind, i))
+        is_suspect = kind == "suspect"
+        revealed = []
+        for clues in remaining:
+            for clue in clues:
+                if clue.entity == i and (clue.kind in SUSPECT_KINDS) == is_suspect:
+                    revealed.append(clue)
+            if len(revealed) >= CLUES_PER_LOOKUP:
+                break
+        solver.observe_lookup(is_suspect, i, revealed[:CLUES_PER_LOOKUP])
+
+    def _rollout(self, belief, world, memo, action, turns_left):
+        # (1 si acusando lo más probable al final se acierta el caso sorteado, entropía tras
+        # la acción) jugando action y después como el detective de referencia. Se cuenta el
+        # acierto y no la probabilidad que da el solver porque esta es conservadora.
+        # memo guarda el resultado de cada posición ya jugada en este caso sorteado.
+        truth, world = world
+        remaining = [clues[:] for clues in world]
+        solver = belief.solver.copy()
+        looked_up, visited = set(belief.looked_up), set(belief.visited)
+        self._play(remaining, solver, looked_up, visited, *action)
+        after = solver_entropy(solver)
+        path = []
+        left = turns_left - 1
+        while True:
+            # Posición canónica dentro del caso sorteado: el orden en que se llegó a ella
+            # no cambia ni la deducción ni lo que queda por revelar.
+            key = (tuple(map(len, remaining)), frozenset(solver.seen), frozenset(looked_up),
+                   frozenset(visited), left)
+            win = memo.get(key)
+            if win is not None:
+                break
+            path.append(key)
+            if left == 0:
+                win = float(solver.best_guess()[0] == truth)
+                break
+            self._play(remaining, solver, looked_up, visited, *detective_action(solver, looked_up, visited))
+            left -= 1
+        for key in path:
+            memo[key] = win
+        return win, after
+
+    # ========================
+    # EVALUACIÓN
+    # ========================
+
+    def rank(self, belief, turns_left, worlds=None):
+        # Lista de (acción, probabilidad esperada de ganar, ganancia de información esperada)
+        # de mejor a peor, y cuántos casos sorteados completos la respaldan. Sin worlds, se
+        # para en cuanto se agota el presupuesto de tiempo, aunque sea a mitad de un caso:
+        # la siguiente llamada con la misma situación sigue por donde se quedó.
+        if turns_left <= 0:
+            return [], 0
+        key = (belief.key, turns_left)
+        stats = self._stats.get(key)
+        if stats is None:
+            cells, cum = self._hypotheses(belief.solver)
+            stats = {"cells": cells, "cum": cum, "rng": random.Random(repr(key)),
+                     "wins": [0.0] * len(ACTIONS), "entropy": [0.0] * len(ACTIONS),
+                     "counts": [0] * len(ACTIONS), "worlds": 0, "current": None,
+                     "base": solver_entropy(belief.solver)}
+            self._stats[key] = stats
+        if worlds is None:
+            deadline = time.perf_counter() + self.budget
+            target = MAX_WORLDS
+        else:
+            deadline, target = None, worlds
+        wins, after, counts = stats["wins"], stats["entropy"], stats["counts"]
+        tries = 0
+        while True:
+            current = stats["current"]
+            if current is None:
+                if not stats["cells"] or stats["worlds"] >= target or tries >= MAX_TRIES:
+                    break
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
+                world = self.sample_world(belief, stats["cells"], stats["cum"], stats["rng"])
+                if world is None:
+                    tries += 1
+                    continue
+                tries = 0
+                # (caso sorteado, posiciones ya evaluadas en él, siguiente acción a jugar)
+                current = stats["current"] = [world, {}, 0]
+            world, memo, j = current
+            while j < len(ACTION_IDS):
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
+                win, h = self._rollout(belief, world, memo, ACTION_IDS[j], turns_left)
+                wins[j] += win
+                after[j] += h
+                counts[j] += 1
+                j += 1
+            current[2] = j
+            if j < len(ACTION_IDS):
+                break
+            stats["worlds"] += 1
+            stats["current"] = None
+
+        ranking = [(action, wins[j] / counts[j], stats["base"] - after[j] / counts[j]) if counts[j]
+                   else (action, 0.0, 0.0) for j, action in enumerate(ACTIONS)]
+        ranking.sort(key=lambda r: (r[1], r[2]), reverse=True)
+        return ranking, stats["worlds"]
+
+# ========================
+# TRABAJADOR EN SEGUNDO PLANO
+# Calcula las sugerencias fuera del hilo de Tk. Solo se atiende la petición más reciente;
+# la interfaz recoge los resultados con root.after, nunca desde este hilo.
+# ========================
+
+class AdvisorWorker(threading.Thread):
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+
+    def submit(self, token, advisor, position, turns_left):
+        self.requests.put((token, advisor, position, turns_left))
+
+    def run(self):
+        while True:
+            request = self.requests.get()
+            while not self.requests.empty():
+                request = self.requests.get_nowait()
+            token, advisor, position, turns_left = request
+            self.results.put((token,) + advisor.rank(position, turns_left))
+
+    def poll(self):
+        # Último resultado disponible (o None), sin bloquear.
+        result = None
+        while not self.results.empty():
+            result = self.results.get_nowait()
+        return result
@@ -0,0 +1,307 @@
+import argparse
+import os
+import pickle
+import time
+from functools import lru_cache
+from multiprocessing import Pool
+
+from engine import (SUSPECTS, WEAPONS, AREAS, SUSPECT_IDS, WEAPON_IDS, AREA_IDS, MAX_TURNS,
+                    CLUE_KINDS, SUSPECT_KINDS, GENERATOR_VERSION, Clue, generate_case)
+from eventlog import (HEADER, RECORD, CASE_SEED, CASE_ID, ACCUSE, NO_TURN, open_segment, segment_paths,
+                      compatible_segments, unpack_clue_ids)
+
+# ========================
+# ANALÍTICA EN FLUJO SOBRE LOS REGISTROS DE EVENTOS
+# Recorre los segmentos de uno o varios registros (eventlog.py) por tramos de registros,
+# sin cargar nada entero en memoria, y acumula:
+#   - tasa de victoria por (culpable, arma, lugar) del caso,
+#   - distribución de los turnos gastados al acusar (todas y solo las acertadas),
+#   - valor predictivo de cada tipo de pista (cuántas de las vistas eran verdaderas, y
+#     cuánto se gana cuando se llegó a ver la verdadera de ese tipo),
+#   - con qué frecuencia una acusación fallida nombra justo lo que sugería una pista falsa.
+# Una partida se cuenta en su primera acusación; lo que la sesión haga después se ignora.
+#
+# Map-reduce: cada tramo se procesa en un proceso aparte y devuelve estadísticas parciales,
+# las sesiones que empezaron en el tramo y siguen abiertas, y los eventos sueltos de
+# sesiones que empezaron antes. La reducción aplica los tramos en orden, así que el
+# resultado no depende del número de procesos.
+#
+# Los resultados se guardan en un archivo de estado junto con cuántos registros de cada
+# segmento ya se procesaron y las sesiones abiertas; al volver a ejecutar solo se leen
+# los registros nuevos. Las sesiones sin actividad durante ABANDON_AFTER tramos se dan
+# por abandonadas para que la memoria no crezca con el historial.
+#
+# Las pistas de cada partida se reconstruyen con generate_case, así que solo se leen los
+# segmentos escritos con el generador actual, y un estado guardado con otra versión del
+# generador se descarta.
+# ========================
+
+STATE_VERSION = 1
+RANGE_RECORDS = 1 << 18
+ABANDON_AFTER = 64
+CELLS = len(SUSPECTS) * len(WEAPONS) * len(AREAS)
+
+@lru_cache(maxsize=4096)
+def case_facts(master_seed, case_id):
+    # (culpable, arma, lugar) como ids y las pistas del caso; se cachea porque muchas
+    # sesiones juegan los mismos casos (catálogo, repeticiones).
+    case = generate_case(master_seed, case_id)
+    truth = (SUSPECT_IDS[case.culprit], WEAPON_IDS[case.weapon], AREA_IDS[case.location])
+    return truth, tuple(Clue(i, code) for i, code in enumerate(case.clues.codes))
+
+class Stats:
+    def __init__(self):
+        self.games = [0] * CELLS
+        self.wins = [0] * CELLS
+        self.turns = [0] * (MAX_TURNS + 1)
+        self.turns_won = [0] * (MAX_TURNS + 1)
+        self.kind_seen = [0] * len(CLUE_KINDS)
+        self.kind_true = [0] * len(CLUE_KINDS)
+        self.games_with_true = [0] * len(CLUE_KINDS)
+        self.wins_with_true = [0] * len(CLUE_KINDS)
+        self.wrong = [0, 0, 0]    # acusaciones con el sospechoso / arma / lugar equivocado
+        self.misled = [0, 0, 0]   # ... y que coinciden con una pista falsa vista
+        self.misled_games = 0
+        self.abandoned = 0
+        self.events = 0
+
+    def merge(self, other):
+        for name, value in vars(other).items():
+            if isinstance(value, list):
+                mine = getattr(self, name)
+                for i, v in enumerate(value):
+                    mine[i] += v
+            else:
+                setattr(self, name, getattr(self, name) + value)
+
+    def add_game(self, state, accused, correct, turn):
+        (s, w, a), clues = state.truth, state.clues
+        cell = (s * len(WEAPONS) + w) * len(AREAS) + a
+        self.games[cell] += 1
+        self.wins[cell] += correct
+        turn = min(turn, MAX_TURNS)
+        self.turns[turn] += 1
+        self.turns_won[turn] += correct
+
+        seen = [c for c in clues if state.seen >> c.id & 1]
+        saw_true = set()
+        for c in seen:
+            self.kind_seen[c.kind] += 1
+            if c.is_true:
+                self.kind_true[c.kind] += 1
+                saw_true.add(c.kind)
+        for kind in saw_true:
+            self.games_with_true[kind] += 1
+            self.wins_with_true[kind] += correct
+
+        # Sospechoso o arma equivocados que nombra alguna pista falsa vista; lugar
+        # equivocado donde apareció una pista falsa de arma.
+        decoys = [c for c in seen if not c.is_true]
+        suggested = (
+            {c.entity for c in decoys if c.kind in SUSPECT_KINDS},
+            {c.entity for c in decoys if c.kind not in SUSPECT_KINDS},
+            {c.area for c in decoys if c.kind not in SUSPECT_KINDS},
+        )
+        misled = False
+        for i, (named, real) in enumerate(zip(accused, state.truth)):
+            if named != real:
+                self.wrong[i] += 1
+                if named in suggested[i]:
+                    self.misled[i] += 1
+                    misled = True
+        self.misled_games += misled
+
+class SessionState:
+    __slots__ = ("seed", "truth", "clues", "seen", "last")
+
+    def __init__(self, seed, last):
+        self.seed = seed
+        self.truth = None
+        self.clues = ()
+        self.seen = 0   # máscara de ids de pistas vistas
+        self.last = last
+
+    def feed(self, event, stats):
+        # Aplica un evento; devuelve True si la partida terminó (primera acusación).
+        _, action, turn, entity, arg = event
+        if action == CASE_ID:
+            self.truth, self.clues = case_facts(self.seed, arg)
+        elif action == ACCUSE:
+            if self.truth is None:
+                return True
+            accused = (entity & 0xF, entity >> 4 & 0xF, entity >> 8 & 0xF)
+            stats.add_game(self, accused, arg, turn)
+            return True
+        elif action != CASE_SEED and arg != NO_TURN:
+            for clue_id in unpack_clue_ids(arg):
+                self.seen |= 1 << clue_id
+        return False
+
+# ========================
+# MAP: UN TRAMO DE UN SEGMENTO
+# ========================
+
+def scan_range(args):
+    # Devuelve (estadísticas, sesiones abiertas que empezaron aquí, eventos de sesiones
+    # que empezaron antes). Las claves de sesión llevan el registro para no mezclar ids.
+    log_key, path, start, end, range_no = args
+    stats = Stats()
+    heads = {}
+    closed = set()
+    fragments = {}
+    mm, view = open_segment(path)
+    records = view[start * RECORD.size:end * RECORD.size]
+    try:
+        for event in RECORD.iter_unpack(records):
+            stats.events += 1
+            key = (log_key, event[0])
+            if event[1] == CASE_SEED:
+                heads[key] = SessionState(event[4], range_no)
+                closed.discard(key)
+                continue
+            state = heads.get(key)
+            if state is not None:
+                if state.feed(event, stats):
+                    del heads[key]
+                    closed.add(key)
+            elif key not in closed:
+                fragments.setdefault(key, []).append(event)
+    finally:
+        records.release()
+        view.release()
+        mm.close()
+    return stats, heads, fragments
+
+# ========================
+# REDUCE Y ESTADO INCREMENTAL
+# ========================
+
+def load_state(path):
+    if path and os.path.exists(path):
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") == STATE_VERSION and state.get("generator") == GENERATOR_VERSION:
+            return state
+    return {"version": STATE_VERSION, "generator": GENERATOR_VERSION, "done": {}, "stats": Stats(),
+            "open": {}, "ranges": 0}
+
+def save_state(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+def find_logs(paths):
+    # Directorios con segmentos: los indicados o, si no tienen, sus subdirectorios
+    # (batch.py escribe un registro por bloque de partidas).
+    logs = []
+    for path in paths:
+        if segment_paths(path):
+            logs.append(path)
+        else:
+            logs.extend(os.path.join(path, d) for d in sorted(os.listdir(path))
+                        if os.path.isdir(os.path.join(path, d)) and segment_paths(os.path.join(path, d)))
+    return logs
+
+def pending_ranges(logs, done, first_range):
+    # Tramos de registros aún no procesados, en orden de registro y de segmento, y los
+    # segmentos descartados por ser de otro formato o generador: [(segmento, motivo)].
+    ranges, skipped = [], []
+    for log in logs:
+        log_key = os.path.abspath(log)
+        paths, log_skipped = compatible_segments(log)
+        skipped += log_skipped
+        for path in map(os.path.abspath, paths):
+            size = os.path.getsize(path)
+            records = max(0, size - HEADER.size) // RECORD.size
+            start = done.get(path, 0)
+            for lo in range(start, records, RANGE_RECORDS):
+                ranges.append((log_key, path, lo, min(lo + RANGE_RECORDS, records),
+                               first_range + len(ranges)))
+    return ranges, skipped
+
+def analyze(paths, state_path=None, workers=None):
+    state = load_state(state_path)
+    stats, open_sessions, done = state["stats"], state["open"], state["done"]
+    ranges, skipped = pending_ranges(find_logs(paths), done, state["ranges"])
+    with Pool(workers) as pool:
+        for (_, path, _, end, range_no), (partial, heads, fragments) in zip(
+                ranges, pool.imap(scan_range, ranges)):
+            stats.merge(partial)
+            for key, events in fragments.items():
+                session = open_sessions.get(key)
+                if session is None:
+                    continue
+                session.last = range_no
+                for event in events:
+                    if session.feed(event, stats):
+                        del open_sessions[key]
+                        break
+            open_sessions.update(heads)
+            done[path] = end
+            if range_no % ABANDON_AFTER == 0:
+                for key in [k for k, s in open_sessions.items() if range_no - s.last > ABANDON_AFTER]:
+                    del open_sessions[key]
+                    stats.abandoned += 1
+    state["ranges"] += len(ranges)
+    if state_path:
+        save_state(state_path, state)
+    return stats, len(ranges), skipped
+
+# ========================
+# INFORME
+# ========================
+
+def report(stats):
+    games = sum(stats.games)
+    wins = sum(stats.wins)
+    print(f"Eventos procesados: {stats.events:,}")
+    print(f"Partidas:           {games:,} ({stats.abandoned:,} sesiones abandonadas)")
+    if not games:
+        return
+    print(f"Tasa de victoria:   {wins / games:.2%}")
+
+    print("\nTurnos al acusar:")
+    for turn, n in enumerate(stats.turns):
+        if n:
+            print(f"  {turn:2}: {n / games:7.2%}  (victoria {stats.turns_won[turn] / n:.2%})")
+
+    print("\nValor predictivo por tipo de pista:")
+    for kind, name in enumerate(("física", "acceso", "social", "objeto")):
+        seen = stats.kind_seen[kind]
+        if not seen:
+            continue
+        with_true = stats.games_with_true[kind]
+        win_with = stats.wins_with_true[kind] / with_true if with_true else 0.0
+        print(f"  {name:>7}: {stats.kind_true[kind] / seen:6.2%} verdaderas; "
+              f"victoria al ver la verdadera {win_with:.2%}")
+
+    print("\nEngañados por pistas falsas:")
+    print(f"  partidas: {stats.misled_games / games:.2%}")
+    for i, name in enumerate(("sospechoso", "arma", "lugar")):
+        if stats.wrong[i]:
+            print(f"  {name:>10}: {stats.misled[i] / stats.wrong[i]:.2%} de los fallos")
+
+    print("\nCasos con peor tasa de victoria (mín. 20 partidas):")
+    cells = [(stats.wins[c] / stats.games[c], c) for c in range(CELLS) if stats.games[c] >= 20]
+    for rate, cell in sorted(cells)[:5]:
+        s, rest = divmod(cell, len(WEAPONS) * len(AREAS))
+        w, a = divmod(rest, len(AREAS))
+        print(f"  {SUSPECTS[s]} / {WEAPONS[w]} / {AREAS[a]}: {rate:.2%} ({stats.games[cell]} partidas)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Analítica sobre los registros de partidas")
+    parser.add_argument("logs", nargs="+", help="directorios de registros de eventos")
+    parser.add_argument("--state", default=None, help="archivo de estado para ejecuciones incrementales")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="procesos")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats, ranges, skipped = analyze(args.logs, args.state, args.workers)
+    for path, reason in skipped:
+        print(f"Omitido: {reason}")
+    print(f"{ranges} tramos nuevos procesados en {time.perf_counter() - start:.1f} s\n")
+    report(stats)
+
+if __name__ == "__main__":
+    main()
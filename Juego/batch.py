@@ -0,0 +1,103 @@
+import argparse
+import os
+import time
+from multiprocessing import Pool
+
+from engine import SUSPECTS, WEAPONS, AREAS, WEAPON_IDS, ClueEngine, new_master_seed
+from solver import DeductionSolver
+from eventlog import EventLog
+from strategies import most_mentioned
+
+# ========================
+# SIMULACIÓN POR LOTES (SIN INTERFAZ)
+# Juega partidas guionizadas con ClueEngine en un pool de procesos para
+# revisar balance y regresiones a gran escala.
+# ========================
+
+def scripted_player(engine):
+    # Jugador de referencia: recorre las áreas en orden aleatorio mientras queden turnos
+    # y acusa a lo más mencionado en las pistas encontradas. El lugar es el área donde
+    # más se menciona el arma elegida. Sus decisiones salen del generador de la partida,
+    # así que cada caso se juega igual en cualquier trabajador.
+    rng = engine.rng
+    while not engine.out_of_turns():
+        engine.enter_area(rng.choice(AREAS))
+    found = engine.found_clues
+    suspect = most_mentioned(SUSPECTS, [c.suspect for c in found], rng)
+    weapon = most_mentioned(WEAPONS, [c.weapon for c in found], rng)
+    weapon_id = WEAPON_IDS[weapon]
+    location = most_mentioned(AREAS, [c.area for c in found if c.weapon == weapon_id], rng)
+    return engine.make_accusation(suspect, weapon, location)
+
+def play_chunk(args):
+    # Ejecuta un bloque de partidas dentro de un proceso trabajador.
+    # Con events_dir, cada bloque escribe su propio registro de eventos (un subdirectorio),
+    # para que los procesos no compartan segmentos ni ids de sesión.
+    master_seed, first_case, games, events_dir = args
+    engine = ClueEngine(master_seed=master_seed)
+    if events_dir is not None:
+        engine.log = EventLog(os.path.join(events_dir, f"bloque-{first_case:012d}"))
+    wins = 0
+    turns = 0
+    candidates = 0
+    for case_id in range(first_case, first_case + games):
+        engine.new_game(case_id)
+        result = scripted_player(engine)
+        wins += result["correct"]
+        turns += engine.turns
+        solver = DeductionSolver()
+        for c in engine.found_clues:
+            solver.observe(c)
+        candidates += solver.candidates()
+    if engine.log is not None:
+        engine.log.close()
+    return games, wins, turns, candidates
+
+def simulate(games, workers=None, seed=None, chunk_size=5000, events_dir=None):
+    # Reparte las partidas en bloques y suma los resultados de todos los trabajadores.
+    # Los casos se numeran 0..games-1: el resultado no depende del reparto en bloques.
+    if seed is None:
+        seed = new_master_seed()
+    chunks = [(seed, first, min(chunk_size, games - first), events_dir)
+              for first in range(0, games, chunk_size)]
+
+    start = time.perf_counter()
+    played = wins = turns = candidates = 0
+    with Pool(workers) as pool:
+        for g, w, t, c in pool.imap_unordered(play_chunk, chunks):
+            played += g
+            wins += w
+            turns += t
+            candidates += c
+    elapsed = time.perf_counter() - start
+
+    return {
+        "seed": seed,
+        "games": played,
+        "wins": wins,
+        "win_rate": wins / played if played else 0.0,
+        "avg_turns": turns / played if played else 0.0,
+        "avg_candidates": candidates / played if played else 0.0,
+        "seconds": elapsed,
+        "games_per_minute": played / elapsed * 60 if elapsed else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulación por lotes de Clue: Night City Protocol")
+    parser.add_argument("-n", "--games", type=int, default=100000, help="número de partidas")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="procesos (por defecto, todos los núcleos)")
+    parser.add_argument("-s", "--seed", type=int, default=None, help="semilla maestra")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="partidas por bloque de trabajo")
+    parser.add_argument("--events", default=None, help="directorio donde registrar las partidas")
+    args = parser.parse_args()
+
+    summary = simulate(args.games, args.workers, args.seed, args.chunk_size, args.events)
+    print(f"Semilla maestra:   {summary['seed']}")
+    print(f"Partidas jugadas:  {summary['games']}")
+    print(f"Tasa de victoria:  {summary['win_rate']:.2%}")
+    print(f"Turnos promedio:   {summary['avg_turns']:.2f}")
+    print(f"Candidatos al acusar (promedio): {summary['avg_candidates']:.1f}")
+    print(f"Tiempo:            {summary['seconds']:.2f} s ({summary['games_per_minute']:,.0f} partidas/min)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,406 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from engine import (DEFAULT_PACK, GENERATOR_VERSION, Case, ClueDeck, ClueEngine, ContentPack,
+                    generate_case, generate_clues)
+from batch import play_chunk
+from strategies import SolverStrategy, play_game
+
+# ========================
+# BANCO DE PRUEBAS DE RENDIMIENTO
+# Mide siempre lo mismo, con semillas fijas:
+#   - generación de pistas (generate_clues) con repartos de 5, 100 y 1.000 entidades,
+#   - latencia de enter_area / enter_suspect / enter_weapon con esos mismos repartos,
+#   - partidas completas por segundo (jugador de batch.py y estrategia solver),
+#   - instantáneas: snapshot, load_snapshot y fork seguido de una acción,
+#   - memoria de un caso cargado (mazo activado con sus índices),
+#   - reconstrucción de pantallas de Tk (show_frame, update_acusacion_pistas,
+#     clear_investigation_buttons). Necesitan pantalla: sin ella se omiten (en un
+#     servidor se puede usar una virtual, p. ej. xvfb-run python bench.py run).
+#
+# Cada prueba se repite REPEATS veces; cada repetición ajusta el nº de operaciones para
+# durar al menos MIN_TIME, con el recolector de basura desactivado (como timeit). Se
+# guarda la mediana por operación y su dispersión (MAD).
+#
+# Los resultados se guardan en JSON (uno por versión) y "compare" los compara: una prueba
+# empeora si la mediana sube más que el umbral y, además, más que NOISE_FACTOR veces la
+# dispersión relativa medida en cualquiera de los dos resultados. Así el ruido de una
+# máquina cargada no da falsas alarmas. Con regresiones, el programa termina con código 1.
+# ========================
+
+RESULTS_VERSION = 1
+REPEATS = 7
+MIN_TIME = 0.1
+THRESHOLD = 0.10
+NOISE_FACTOR = 3
+CAST_SIZES = (5, 100, 1000)
+SEED = 20240601
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+
+BENCHMARKS = {}
+
+def benchmark(name, unit="us"):
+    # Registra una prueba. La función devuelve run(number) -> segundos que tardan
+    # number operaciones (solo la parte medida); unit "bytes" son medidas directas.
+    def register(func):
+        BENCHMARKS[name] = (func, unit)
+        return func
+    return register
+
+def cast_pack(n):
+    # Paquete con n sospechosos, armas y áreas (los textos de serie).
+    if n == len(DEFAULT_PACK.suspects):
+        return DEFAULT_PACK
+    return ContentPack([f"Sospechoso {i}" for i in range(n)], [f"Arma {i}" for i in range(n)],
+                       [f"Área {i}" for i in range(n)], DEFAULT_PACK.templates,
+                       DEFAULT_PACK.weathers, DEFAULT_PACK.narrative)
+
+def fresh_case(case):
+    # Copia del caso con el mazo sin jugar (el array de códigos se comparte).
+    deck = ClueDeck(case.clues.codes, case.clues.area_start, case.clues.pack)
+    return Case(case.master_seed, case.case_id, case.culprit, case.weapon, case.location, deck)
+
+# ========================
+# MOTOR
+# ========================
+
+def generation_bench(n):
+    pack = cast_pack(n)
+
+    def run(number):
+        rng = random.Random(SEED)
+        start = time.perf_counter()
+        for _ in range(number):
+            generate_clues(rng.choice(pack.suspects), rng.choice(pack.weapons), rng.choice(pack.areas),
+                           rng=rng, pack=pack)
+        return time.perf_counter() - start
+    return run
+
+def action_bench(n, action):
+    # Latencia de una acción sobre un caso recién cargado (mazo ya activado): visita el
+    # lugar del crimen o investiga al culpable o el arma, que siempre tienen pistas.
+    pack = cast_pack(n)
+    cases = [generate_case(SEED, i, pack=pack) for i in range(64)]
+    engine = ClueEngine(master_seed=SEED, pack=pack)
+    target = {"enter_area": "location", "enter_suspect": "culprit", "enter_weapon": "weapon"}[action]
+    clock = time.perf_counter
+
+    def run(number):
+        elapsed = 0.0
+        for i in range(number):
+            case = fresh_case(cases[i % len(cases)])
+            engine.load_case(case)
+            case.clues.activate()
+            act, name = getattr(engine, action), getattr(case, target)
+            start = clock()
+            act(name)
+            elapsed += clock() - start
+        return elapsed
+    return run
+
+for _n in CAST_SIZES:
+    benchmark(f"generate_clues[{_n}]")(lambda n=_n: generation_bench(n))
+    for _action in ("enter_area", "enter_suspect", "enter_weapon"):
+        benchmark(f"{_action}[{_n}]")(lambda n=_n, a=_action: action_bench(n, a))
+
+@benchmark("game[batch]")
+def game_batch_bench():
+    first = [0]
+
+    def run(number):
+        start = time.perf_counter()
+        play_chunk((SEED, first[0], number, None))
+        first[0] += number
+        return time.perf_counter() - start
+    return run
+
+@benchmark("game[solver]")
+def game_solver_bench():
+    engine = ClueEngine(master_seed=SEED)
+    strategy = SolverStrategy()
+
+    def run(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            engine.new_game()
+            play_game(strategy, engine)
+        return time.perf_counter() - start
+    return run
+
+def midgame_engine():
+    # Partida a medias (4 turnos) para las pruebas de instantáneas.
+    engine = ClueEngine(master_seed=SEED)
+    for area in DEFAULT_PACK.areas[:2]:
+        engine.enter_area(area)
+    engine.enter_suspect(engine.culprit)
+    engine.enter_weapon(engine.weapon)
+    return engine
+
+@benchmark("snapshot")
+def snapshot_bench():
+    engine = midgame_engine()
+
+    def run(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            engine.snapshot()
+        return time.perf_counter() - start
+    return run
+
+@benchmark("load_snapshot")
+def load_snapshot_bench():
+    data = midgame_engine().snapshot()
+    engine = ClueEngine(master_seed=SEED)
+
+    def run(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            engine.load_snapshot(data)
+        return time.perf_counter() - start
+    return run
+
+@benchmark("fork+enter_area")
+def fork_bench():
+    # Bifurcar y jugar una acción que obliga a copiar el mazo (el caso típico de una IA).
+    engine = midgame_engine()
+    area = DEFAULT_PACK.areas[3]
+
+    def run(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            engine.fork().enter_area(area)
+        return time.perf_counter() - start
+    return run
+
+@benchmark("memory_per_case", unit="bytes")
+def memory_bench(count=500):
+    # Bytes por caso cargado: caso generado y mazo activado (pistas e índices).
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    cases = [generate_case(SEED, i) for i in range(count)]
+    for case in cases:
+        case.clues.activate()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / count
+
+# ========================
+# INTERFAZ (TK)
+# ========================
+
+def open_gui():
+    # (root, app) de la interfaz real, o None si no hay pantalla. El registro de eventos
+    # se escribe en un directorio temporal para no mezclar las pruebas con partidas reales.
+    import tkinter as tk
+    import clue_night_city
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None
+    clue_night_city.EVENTLOG_DIR = tempfile.mkdtemp(prefix="bench-eventos-")
+    app = clue_night_city.ClueGameGUI(root)
+    root.update()
+    return root, app
+
+def tk_bench(step):
+    def factory(gui):
+        root, app = gui
+        app.engine.new_game()
+        for area in DEFAULT_PACK.areas:
+            app.engine.enter_area(area)
+
+        def run(number):
+            start = time.perf_counter()
+            for i in range(number):
+                step(app, i)
+                root.update_idletasks()
+            return time.perf_counter() - start
+        return run
+    return factory
+
+TK_BENCHMARKS = {
+    "tk.show_frame": tk_bench(lambda app, i: app.show_frame(("Menu", "Investigation", "Accusacion")[i % 3])),
+    "tk.update_acusacion_pistas": tk_bench(lambda app, i: app.update_acusacion_pistas()),
+    "tk.clear_investigation_buttons": tk_bench(
+        lambda app, i: (app.investigate_area_menu(), app.clear_investigation_buttons())),
+}
+
+# ========================
+# EJECUCIÓN
+# ========================
+
+def measure(run, repeats=REPEATS, min_time=MIN_TIME):
+    # Tiempo por operación (µs) de cada repetición, con number ajustado como timeit.autorange.
+    number = 1
+    while run(number) < min_time / 10:
+        number *= 10
+    samples = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            n = number
+            while True:
+                elapsed = run(n)
+                if elapsed >= min_time or n >= 1 << 24:
+                    break
+                n = int(n * min_time / max(elapsed, 1e-9) * 1.1) + 1
+            samples.append(elapsed / n * 1e6)
+            number = n
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return samples
+
+def summarize(samples, unit):
+    median = statistics.median(samples)
+    mad = statistics.median(abs(s - median) for s in samples)
+    return {"unit": unit, "median": median, "mad": mad, "samples": samples}
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+def run_benchmarks(selected=None, repeats=REPEATS, min_time=MIN_TIME, progress=print):
+    results = {}
+    skipped = []
+    for name, (factory, unit) in BENCHMARKS.items():
+        if selected and not any(s in name for s in selected):
+            continue
+        if unit == "bytes":
+            samples = [factory() for _ in range(3)]
+        else:
+            samples = measure(factory(), repeats, min_time)
+        results[name] = summarize(samples, unit)
+        progress(f"  {name:<34} {format_value(results[name])}")
+
+    tk_names = [n for n in TK_BENCHMARKS if not selected or any(s in n for s in selected)]
+    gui = open_gui() if tk_names else None
+    if gui is None:
+        skipped.extend(tk_names)
+    else:
+        try:
+            for name in tk_names:
+                results[name] = summarize(measure(TK_BENCHMARKS[name](gui), repeats, min_time), "us")
+                progress(f"  {name:<34} {format_value(results[name])}")
+        finally:
+            gui[0].destroy()
+    return {
+        "version": RESULTS_VERSION,
+        "commit": git_commit(),
+        "generator_version": GENERATOR_VERSION,
+        "python": sys.version.split()[0],
+        "machine": platform.platform(),
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "results": results,
+        "skipped": skipped,
+    }
+
+def format_value(result):
+    if result["unit"] == "bytes":
+        return f"{result['median']:>10.0f} bytes"
+    spread = result["mad"] / result["median"] if result["median"] else 0.0
+    return f"{result['median']:>10.2f} µs  ±{spread:.1%}  ({1e6 / result['median']:,.0f}/s)"
+
+# ========================
+# COMPARACIÓN
+# ========================
+
+def compare(base, new, threshold=THRESHOLD, noise_factor=NOISE_FACTOR):
+    # Devuelve (filas, regresiones); cada fila es (nombre, base, nuevo, cambio, límite, veredicto).
+    rows = []
+    regressions = []
+    for name in base["results"]:
+        if name not in new["results"]:
+            continue
+        b, n = base["results"][name], new["results"][name]
+        change = n["median"] / b["median"] - 1 if b["median"] else 0.0
+        noise = max(b["mad"] / b["median"] if b["median"] else 0.0,
+                    n["mad"] / n["median"] if n["median"] else 0.0)
+        limit = max(threshold, noise_factor * noise)
+        if change > limit:
+            verdict = "PEOR"
+            regressions.append(name)
+        elif change < -limit:
+            verdict = "mejor"
+        else:
+            verdict = "igual"
+        rows.append((name, b["median"], n["median"], change, limit, verdict))
+    return rows, regressions
+
+def print_comparison(base, new, rows):
+    print(f"Base:  {base.get('commit') or '?'} ({base['created']})")
+    print(f"Nueva: {new.get('commit') or '?'} ({new['created']})\n")
+    print(f"{'prueba':<34} {'base':>12} {'nueva':>12} {'cambio':>8} {'límite':>7}")
+    for name, b, n, change, limit, verdict in rows:
+        print(f"{name:<34} {b:>12.2f} {n:>12.2f} {change:>+8.1%} {limit:>6.0%}  {verdict}")
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        results = json.load(f)
+    if results.get("version") != RESULTS_VERSION:
+        raise ValueError(f"{path} no es un resultado de bench.py compatible")
+    return results
+
+def save_results(results, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=1, ensure_ascii=False)
+
+def main():
+    parser = argparse.ArgumentParser(description="Pruebas de rendimiento del motor y la interfaz")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_cmd = commands.add_parser("run", help="ejecuta las pruebas y guarda el resultado")
+    run_cmd.add_argument("-o", "--output", default=None,
+                         help="archivo JSON de salida (por defecto benchmarks/bench-<commit>.json)")
+    run_cmd.add_argument("-k", "--select", nargs="+", default=None,
+                         help="solo las pruebas cuyo nombre contenga alguno de estos textos")
+    run_cmd.add_argument("-r", "--repeats", type=int, default=REPEATS, help="repeticiones por prueba")
+    run_cmd.add_argument("--min-time", type=float, default=MIN_TIME, help="segundos por repetición")
+    run_cmd.add_argument("--baseline", default=None, help="resultado con el que comparar al terminar")
+    cmp_cmd = commands.add_parser("compare", help="compara dos resultados")
+    cmp_cmd.add_argument("base")
+    cmp_cmd.add_argument("new")
+    for sub in (run_cmd, cmp_cmd):
+        sub.add_argument("--threshold", type=float, default=THRESHOLD,
+                         help="empeoramiento mínimo que cuenta como regresión (0.10 = 10 %%)")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        print("Pruebas:")
+        new = run_benchmarks(args.select, args.repeats, args.min_time)
+        if new["skipped"]:
+            print(f"Omitidas (sin pantalla): {', '.join(new['skipped'])}")
+        path = args.output or os.path.join(BENCH_DIR, f"bench-{new['commit'] or 'local'}.json")
+        save_results(new, path)
+        print(f"Resultados guardados en {path}")
+        if args.baseline is None:
+            return
+        base = load_results(args.baseline)
+        print()
+    else:
+        base, new = load_results(args.base), load_results(args.new)
+    rows, regressions = compare(base, new, args.threshold)
+    print_comparison(base, new, rows)
+    if regressions:
+        print(f"\nRegresiones: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\nSin regresiones.")
+
+if __name__ == "__main__":
+    main()
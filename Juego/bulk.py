@@ -0,0 +1,137 @@
+import argparse
+import os
+import time
+from array import array
+
+import numpy as np
+
+from engine import (SUSPECTS, WEAPONS, AREAS, DECOY_CLUES, PHYSICAL, ACCESS, SOCIAL, ITEM,
+                    Case, ClueDeck, new_master_seed)
+
+# ========================
+# GENERACIÓN MASIVA DE CASOS (NumPy)
+# Sortea N casos a la vez con la misma distribución que generate_case: culpable, arma y
+# lugar uniformes; 4 pistas verdaderas (física y objeto en el lugar, acceso y social en
+# otra área al azar) y DECOY_CLUES pistas falsas de tipo y área uniformes que nombran
+# otra entidad distinta de la real. Las pistas usan el mismo entero empaquetado que
+# pack_clue y quedan agrupadas por área y barajadas dentro de cada una, igual que
+# ClueDeck.codes.
+#
+# Los casos no coinciden bit a bit con generate_case (usan otro generador), pero sí en
+# distribución; con la misma semilla y tamaño de bloque la salida es siempre la misma.
+# ========================
+
+CLUES_PER_CASE = 4 + DECOY_CLUES
+FIELDS = ("culprit", "weapon", "location", "codes", "area_start")
+
+def generate_cases(n, rng):
+    # Devuelve un dict de arrays con los n casos sorteados con el Generator rng.
+    n_suspects, n_weapons, n_areas = len(SUSPECTS), len(WEAPONS), len(AREAS)
+    culprit = rng.integers(0, n_suspects, n, dtype=np.uint32)
+    weapon = rng.integers(0, n_weapons, n, dtype=np.uint32)
+    location = rng.integers(0, n_areas, n, dtype=np.uint32)
+    # Área de las pistas del culpable: uniforme entre las que no son el lugar del crimen.
+    random_area = (location + 1 + rng.integers(0, n_areas - 1, n, dtype=np.uint32)) % n_areas
+
+    kind = np.empty((n, CLUES_PER_CASE), np.uint32)
+    area = np.empty_like(kind)
+    entity = np.empty_like(kind)
+    is_true = np.zeros_like(kind)
+
+    # Pistas verdaderas, en el mismo orden que generate_clues.
+    kind[:, :4] = (PHYSICAL, ITEM, ACCESS, SOCIAL)
+    area[:, 0:2] = location[:, None]
+    area[:, 2:4] = random_area[:, None]
+    entity[:, 0:2] = weapon[:, None]
+    entity[:, 2:4] = culprit[:, None]
+    is_true[:, :4] = 1
+
+    # Pistas falsas: la entidad se elige entre las otras sumando un desplazamiento
+    # uniforme en [1, size-1] a la real, sin construir listas filtradas.
+    decoy_kind = rng.integers(0, 4, (n, DECOY_CLUES), dtype=np.uint32)
+    about_suspect = (decoy_kind == ACCESS) | (decoy_kind == SOCIAL)
+    truth = np.where(about_suspect, culprit[:, None], weapon[:, None])
+    size = np.where(about_suspect, n_suspects, n_weapons).astype(np.uint32)
+    kind[:, 4:] = decoy_kind
+    area[:, 4:] = rng.integers(0, n_areas, (n, DECOY_CLUES), dtype=np.uint32)
+    entity[:, 4:] = (truth + 1 + rng.integers(0, size - 1, dtype=np.uint32)) % size
+
+    codes = entity << 18 | area << 4 | kind << 1 | is_true
+
+    # Agrupa por área y baraja dentro de cada una: ordenar por área + ruido en [0, 1)
+    # da una permutación uniforme de las pistas de cada área.
+    order = np.argsort(area + rng.random(area.shape), axis=1)
+    codes = np.take_along_axis(codes, order, axis=1)
+    row = np.arange(n, dtype=np.int64)[:, None] * n_areas
+    counts = np.bincount((row + area).ravel(), minlength=n * n_areas).reshape(n, n_areas)
+    area_start = np.zeros((n, n_areas + 1), np.uint8)
+    np.cumsum(counts, axis=1, out=area_start[:, 1:])
+
+    return {
+        "culprit": culprit.astype(np.uint16),
+        "weapon": weapon.astype(np.uint16),
+        "location": location.astype(np.uint16),
+        "codes": codes,
+        "area_start": area_start,
+    }
+
+def chunk_rng(master_seed, chunk_index):
+    return np.random.default_rng([master_seed, chunk_index])
+
+def iter_cases(n, master_seed, chunk_size=1_000_000):
+    # Genera los casos por bloques; la memoria usada depende solo de chunk_size.
+    for chunk_index, first in enumerate(range(0, n, chunk_size)):
+        yield first, generate_cases(min(chunk_size, n - first), chunk_rng(master_seed, chunk_index))
+
+def write_cases(directory, n, master_seed, chunk_size=1_000_000):
+    # Escribe los casos en un directorio con un .npy por campo, bloque a bloque sobre
+    # archivos mapeados en memoria, así 100M de casos caben en memoria acotada.
+    os.makedirs(directory, exist_ok=True)
+    shapes = {
+        "culprit": (n,),
+        "weapon": (n,),
+        "location": (n,),
+        "codes": (n, CLUES_PER_CASE),
+        "area_start": (n, len(AREAS) + 1),
+    }
+    dtypes = {"culprit": np.uint16, "weapon": np.uint16, "location": np.uint16,
+              "codes": np.uint32, "area_start": np.uint8}
+    outputs = {
+        name: np.lib.format.open_memmap(os.path.join(directory, f"{name}.npy"), mode="w+",
+                                        dtype=dtypes[name], shape=shapes[name])
+        for name in FIELDS
+    }
+    for first, cases in iter_cases(n, master_seed, chunk_size):
+        last = first + len(cases["culprit"])
+        for name in FIELDS:
+            outputs[name][first:last] = cases[name]
+    for out in outputs.values():
+        out.flush()
+
+def load_cases(directory):
+    # Abre un corpus escrito con write_cases sin cargarlo en memoria.
+    return {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in FIELDS}
+
+def case_at(cases, i, master_seed=None):
+    # Convierte la fila i de un corpus en un Case jugable por ClueEngine.load_case.
+    clues = ClueDeck(array("I", cases["codes"][i].tolist()), array("H", cases["area_start"][i].tolist()))
+    return Case(master_seed, i, SUSPECTS[cases["culprit"][i]], WEAPONS[cases["weapon"][i]],
+                AREAS[cases["location"][i]], clues)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generación masiva de casos como arrays NumPy")
+    parser.add_argument("directory", help="directorio de salida (un .npy por campo)")
+    parser.add_argument("-n", "--cases", type=int, default=1_000_000, help="número de casos")
+    parser.add_argument("-s", "--seed", type=int, default=None, help="semilla maestra")
+    parser.add_argument("--chunk-size", type=int, default=1_000_000, help="casos por bloque")
+    args = parser.parse_args()
+
+    seed = new_master_seed() if args.seed is None else args.seed
+    start = time.perf_counter()
+    write_cases(args.directory, args.cases, seed, args.chunk_size)
+    elapsed = time.perf_counter() - start
+    print(f"Semilla maestra: {seed}")
+    print(f"{args.cases} casos en {elapsed:.2f} s ({args.cases / elapsed:,.0f} casos/s)")
+
+if __name__ == "__main__":
+    main()
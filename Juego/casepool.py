@@ -0,0 +1,79 @@
+import threading
+
+from engine import generate_case, new_master_seed
+
+# ========================
+# RESERVA DE CASOS PRE-GENERADOS
+# Un hilo en segundo plano mantiene una reserva acotada de casos listos. Cuando baja
+# hasta la marca mínima (low_water) vuelve a llenarla hasta depth. Si se pide un caso que
+# aún no está listo se genera en el momento, así que nunca se bloquea esperando al hilo.
+#
+# Los casos se entregan siempre en orden de id, de modo que una semilla maestra produce
+# siempre la misma serie de partidas. Cada id se reserva antes de generarlo y el caso se
+# guarda en su hueco (un dict por id); get() entrega el siguiente id de la serie. Si el
+# hilo aún lo está generando, get() lo genera también y el hilo descarta su copia (un
+# caso depende solo de (semilla maestra, id), así que ambas son idénticas).
+# ========================
+
+class CasePool:
+    def __init__(self, master_seed=None, depth=16, low_water=4, generate=generate_case):
+        self.master_seed = new_master_seed() if master_seed is None else master_seed
+        self.depth = depth
+        self.low_water = min(low_water, depth - 1)
+        self.misses = 0  # casos que hubo que generar en el momento
+        self._generate = generate
+        self._ready = {}     # id -> caso ya generado y aún no entregado
+        self._next_id = 0    # siguiente id que reservará el hilo
+        self._next_get = 0   # siguiente id que entregará get()
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        return len(self._ready)
+
+    def _reserved(self):
+        # Ids reservados por delante de get(): listos o generándose.
+        return self._next_id - self._next_get
+
+    def _fill(self):
+        while True:
+            with self._cond:
+                while not self._closed and self._reserved() > self.low_water:
+                    self._cond.wait()
+                if self._closed:
+                    return
+            # Rellena hasta la profundidad configurada; la generación va fuera del candado.
+            while True:
+                with self._cond:
+                    if self._closed or self._reserved() >= self.depth:
+                        break
+                    case_id = self._next_id
+                    self._next_id += 1
+                case = self._generate(self.master_seed, case_id)
+                with self._cond:
+                    # Si get() ya lo pidió, lo generó por su cuenta: esta copia sobra.
+                    if case_id >= self._next_get:
+                        self._ready[case_id] = case
+
+    def get(self):
+        # Devuelve el siguiente caso de la serie en tiempo constante o, si no está listo,
+        # lo genera en el momento.
+        with self._cond:
+            case_id = self._next_get
+            self._next_get += 1
+            self._next_id = max(self._next_id, self._next_get)
+            case = self._ready.pop(case_id, None)
+            if self._reserved() <= self.low_water:
+                self._cond.notify()
+            if case is not None:
+                return case
+            self.misses += 1
+        return self._generate(self.master_seed, case_id)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
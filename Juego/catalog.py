@@ -0,0 +1,170 @@
+import argparse
+import mmap
+import os
+import struct
+import time
+from array import array
+
+from engine import (SUSPECTS, WEAPONS, AREAS, SUSPECT_IDS, WEAPON_IDS, AREA_IDS, MAX_TURNS,
+                    GENERATOR_VERSION, ClueEngine, generate_case)
+from solver import DeductionSolver
+from strategies import detective_action
+
+# ========================
+# CATÁLOGO DE CASOS POR DIFICULTAD
+# Un indexador fuera de línea juega cada caso de un rango de ids con un detective de
+# referencia y anota en cuántos turnos llega a acusar con confianza al culpable, el arma
+# y el lugar correctos. Ese número es la dificultad del caso (MAX_TURNS + 1 si no lo
+# logra dentro del límite).
+#
+# El detective (strategies.detective_action) no conoce el mazo: investiga siempre el
+# sospechoso o arma más probable que aún no investigó (según DeductionSolver) y, cuando
+# ya los investigó todos, visita las áreas más probables. Se considera resuelto cuando
+# la hipótesis más probable es la real con probabilidad >= CERTAINTY.
+#
+# Formato del archivo (pensado para abrirse con mmap, sin cargarlo):
+#   cabecera  <8sIIQd  magia, versión del generador, nº de cubetas, semilla, CERTAINTY
+#   offsets   uint32 × (cubetas + 1)   inicio de cada cubeta dentro de los ids
+#   ids       uint32 × casos           ids de caso ordenados por dificultad
+# Los ids de cubetas contiguas quedan contiguos, así que elegir un caso al azar dentro
+# de cualquier rango de dificultad es O(1).
+# ========================
+
+MAGIC = b"CLUECAT\0"
+HEADER = struct.Struct("<8sIIQd")
+CERTAINTY = 0.7
+UNSOLVED = MAX_TURNS + 1
+N_BUCKETS = UNSOLVED + 1
+
+# Rangos de dificultad (en turnos) que ofrece la interfaz.
+DIFFICULTIES = {
+    "Fácil": (1, 3),
+    "Media": (4, 6),
+    "Difícil": (7, MAX_TURNS),
+}
+
+# ========================
+# PUNTUACIÓN DE UN CASO
+# ========================
+
+def score_case(case, engine=None, threshold=CERTAINTY):
+    # Turnos que necesita el detective de referencia para resolver el caso.
+    if engine is None:
+        engine = ClueEngine()
+    engine.load_case(case)
+    solver = DeductionSolver()
+    truth = (SUSPECT_IDS[case.culprit], WEAPON_IDS[case.weapon], AREA_IDS[case.location])
+    looked_up, visited = set(), set()
+    while not engine.out_of_turns():
+        kind, i = detective_action(solver, looked_up, visited)
+        if kind == "area":
+            visited.add(i)
+            for clue in engine.enter_area(AREAS[i]):
+                solver.observe(clue)
+        else:
+            looked_up.add((kind, i))
+            if kind == "suspect":
+                solver.observe_lookup(True, i, engine.enter_suspect(SUSPECTS[i]))
+            else:
+                solver.observe_lookup(False, i, engine.enter_weapon(WEAPONS[i]))
+        guess, p = solver.best_guess()
+        if guess == truth and p >= threshold:
+            return engine.turns
+    return UNSOLVED
+
+def _score_chunk(args):
+    master_seed, first, count = args
+    engine = ClueEngine(master_seed=master_seed)
+    return first, array("B", (score_case(generate_case(master_seed, case_id), engine)
+                              for case_id in range(first, first + count)))
+
+# ========================
+# CONSTRUCCIÓN Y LECTURA DEL CATÁLOGO
+# ========================
+
+def build_catalog(path, master_seed, first, count, workers=None, chunk_size=2000):
+    # Puntúa los casos [first, first + count) en paralelo y escribe el catálogo.
+    # multiprocessing se importa aquí: la interfaz solo lee catálogos y arranca sin él.
+    from multiprocessing import Pool
+    buckets = [array("I") for _ in range(N_BUCKETS)]
+    chunks = [(master_seed, start, min(chunk_size, first + count - start))
+              for start in range(first, first + count, chunk_size)]
+    with Pool(workers) as pool:
+        # imap (ordenado) para que el catálogo salga igual en cualquier reparto.
+        for start, difficulties in pool.imap(_score_chunk, chunks):
+            for offset, difficulty in enumerate(difficulties):
+                buckets[difficulty].append(start + offset)
+
+    offsets = array("I", [0])
+    for bucket in buckets:
+        offsets.append(offsets[-1] + len(bucket))
+    # Se escribe aparte y se renombra: un corte a medias no deja un catálogo truncado.
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, GENERATOR_VERSION, N_BUCKETS, master_seed, CERTAINTY))
+        offsets.tofile(f)
+        for bucket in buckets:
+            bucket.tofile(f)
+    os.replace(tmp_path, path)
+    return [len(b) for b in buckets]
+
+class DifficultyCatalog:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise ValueError(f"{path} no es un catálogo de casos")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_buckets, self.master_seed, self.threshold = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{path} no es un catálogo de casos")
+        if version != GENERATOR_VERSION:
+            raise ValueError(f"{path} se creó con la versión {version} del generador "
+                             f"(actual: {GENERATOR_VERSION}); hay que reconstruirlo")
+        view = memoryview(self._mmap)
+        ids_start = HEADER.size + 4 * (n_buckets + 1)
+        if len(view) < ids_start:
+            raise ValueError(f"{path} está truncado; hay que reconstruirlo")
+        self.offsets = view[HEADER.size:ids_start].cast("I")
+        if len(view) != ids_start + 4 * self.offsets[-1]:
+            raise ValueError(f"{path} está truncado; hay que reconstruirlo")
+        self.case_ids = view[ids_start:].cast("I")
+
+    def count(self, lo, hi):
+        # Casos con dificultad entre lo y hi turnos (inclusive).
+        return self.offsets[hi + 1] - self.offsets[lo]
+
+    def pick(self, lo, hi, rng):
+        # Id de un caso al azar con dificultad entre lo y hi, o None si no hay ninguno.
+        n = self.count(lo, hi)
+        if n == 0:
+            return None
+        return self.case_ids[self.offsets[lo] + rng.randrange(n)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Catálogo de casos por dificultad")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="puntúa un rango de casos y escribe el catálogo")
+    build.add_argument("path")
+    build.add_argument("-s", "--seed", type=int, required=True, help="semilla maestra")
+    build.add_argument("-n", "--cases", type=int, default=100000, help="número de casos")
+    build.add_argument("--first", type=int, default=0, help="primer id de caso")
+    build.add_argument("-w", "--workers", type=int, default=None, help="procesos")
+    info = sub.add_parser("info", help="muestra cuántos casos hay por dificultad")
+    info.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        counts = build_catalog(args.path, args.seed, args.first, args.cases, args.workers)
+        print(f"{args.cases} casos puntuados en {time.perf_counter() - start:.1f} s")
+    else:
+        catalog = DifficultyCatalog(args.path)
+        counts = [catalog.count(d, d) for d in range(N_BUCKETS)]
+        print(f"Semilla maestra: {catalog.master_seed}")
+    for difficulty, n in enumerate(counts):
+        if n:
+            label = "sin resolver" if difficulty == UNSOLVED else f"{difficulty} turnos"
+            print(f"  {label:>13}: {n}")
+
+if __name__ == "__main__":
+    main()
@@ -1,81 +1,74 @@
+import time
+STARTUP_START = time.perf_counter()
+
+import argparse
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
-import random
 import textwrap
 import os
+import random
 
-# ========================
-# DATOS PRINCIPALES DEL JUEGO
-# ========================
-
-SUSPECTS = ["Hacker", "Jefe seguridad", "Ejecutiva", "Mercenario", "Investigadora"]
-WEAPONS = ["Mantis Blades", "Monowire", "Cuchillo", "Katana", "Pistola"]
-AREAS = ["Laboratorio Biologico", "Sala Seguridad", "Penthouse", "Cafetería", "Taller de prototipos"]
-
-# Plantilla para generar el resultado final del caso
-NARRATIVE_TEMPLATE = (
-    "El culpable, {culprit}, fue detectado en {location}. "
-    "Usó su {weapon} para cometer el crimen. "
-    "Algunos testigos reportaron movimientos sospechosos cerca de {secondary_area}. "
-    "El hecho ocurrió durante {weather}."
-)
-
-# ========================
-# FUNCIONES PARA GENERAR PISTAS DIGERIBLES
-# ========================
-
-def clue_physical(area, weapon, is_true):
-    if is_true:
-        return f"Se encontraron rastros en {area} que podrían indicar que se usó un {weapon}."
-    else:
-        other = random.choice([w for w in WEAPONS if w != weapon])
-        return f"En {area} hay señales que parecen de un {other}, pero no es concluyente."
-
-def clue_access(area, culprit, is_true):
-    if is_true:
-        return f"Se registró actividad reciente de alguien similar a {culprit} en {area}."
-    else:
-        other = random.choice([s for s in SUSPECTS if s != culprit])
-        return f"Al parecer {other} estuvo en {area}, aunque no hay certeza."
-
-def clue_social(area, culprit, is_true):
-    if is_true:
-        return f"Un testigo vio a alguien con características de {culprit} cerca de {area}."
-    else:
-        other = random.choice([s for s in SUSPECTS if s != culprit])
-        return f"Se rumorea que {other} estaba cerca de {area}, pero no es seguro."
-
-def clue_item(area, weapon, is_true):
-    if is_true:
-        return f"Se encontró un objeto relacionado con {weapon} dentro de {area}."
-    else:
-        other = random.choice([w for w in WEAPONS if w != weapon])
-        return f"Hay un objeto que parece vinculado a un {other}, aunque no es definitivo."
-
-def generate_clues(culprit, weapon, location, seed=None):
-    if seed is not None:
-        random.seed(seed)
-    clues_by_area = {area: [] for area in AREAS}
-
-    clues_by_area[location].append({"text": clue_physical(location, weapon, True), "true": True})
-    clues_by_area[location].append({"text": clue_item(location, weapon, True), "true": True})
-    random_area = random.choice([a for a in AREAS if a != location])
-    clues_by_area[random_area].append({"text": clue_access(random_area, culprit, True), "true": True})
-    clues_by_area[random_area].append({"text": clue_social(random_area, culprit, True), "true": True})
-
-    for _ in range(8):
-        tpl = random.choice([clue_physical, clue_access, clue_social, clue_item])
-        area = random.choice(AREAS)
-        if tpl in (clue_physical, clue_item):
-            txt = tpl(area, weapon, False)
-        else:
-            txt = tpl(area, culprit, False)
-        clues_by_area[area].append({"text": txt, "true": False})
-
-    for area in clues_by_area:
-        random.shuffle(clues_by_area[area])
-    return clues_by_area
+from engine import SUSPECTS, WEAPONS, AREAS, SUSPECT_IDS, WEAPON_IDS, ClueEngine, generate_case
+from catalog import DifficultyCatalog, DIFFICULTIES
+from casepool import CasePool
+from solver import DeductionSolver
+from advisor import MoveAdvisor, AdvisorWorker, describe_action
+from widgets import ClueLogView
+from eventlog import EventLog
+
+IMPORTS_DONE = time.perf_counter()
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Catálogo opcional de casos por dificultad (se crea con: python catalog.py build casos.cat ...)
+CATALOG_PATH = os.path.join(BASE_DIR, "casos.cat")
+ANY_DIFFICULTY = "Cualquiera"
+# Registro binario de las partidas jugadas (ver eventlog.py)
+EVENTLOG_DIR = os.path.join(BASE_DIR, "registros")
+# Líneas que se conservan en el texto de investigación; las más antiguas se descartan.
+INVEST_MAX_LINES = 400
+
+# Logo original y copia ya reducida que Tk puede abrir directamente (PNG nativo en Tk 8.6).
+# La copia está en el repositorio y se usa siempre que exista; solo se regenera con Pillow
+# si falta (para cambiar el logo, se sustituye el original y se borra la copia). No se
+# comparan fechas: al clonar, el orden de escritura de los archivos es arbitrario.
+LOGO_PATH = os.path.join(BASE_DIR, "Images", "Logo Clue.png")
+LOGO_SIZE = (450, 200)  # caja máxima: thumbnail conserva la proporción del original
+LOGO_CACHE_PATH = os.path.join(BASE_DIR, "Images", "Logo Clue cache.png")
+
+def build_logo_cache():
+    # Escala el logo original y guarda la copia. Devuelve False si no hay Pillow o logo, o
+    # si no se pudo escribir. Se escribe aparte y se renombra: nunca queda una copia a medias.
+    if not os.path.exists(LOGO_PATH):
+        return False
+    try:
+        from PIL import Image
+    except ImportError:
+        return False
+    partial = LOGO_CACHE_PATH + ".tmp"
+    try:
+        with Image.open(LOGO_PATH) as img:
+            img.thumbnail(LOGO_SIZE)
+            img.save(partial, format="PNG")
+        os.replace(partial, LOGO_CACHE_PATH)
+    except OSError:
+        return False
+    return True
+
+def open_event_log():
+    # Sin permisos de escritura se juega igual, solo que sin registro.
+    try:
+        return EventLog(EVENTLOG_DIR)
+    except OSError:
+        return None
+
+def load_catalog():
+    # Devuelve el catálogo si existe, se puede leer y corresponde al generador actual; si no, None.
+    if not os.path.exists(CATALOG_PATH):
+        return None
+    try:
+        return DifficultyCatalog(CATALOG_PATH)
+    except (OSError, ValueError):
+        return None
 
 # ========================
 # CLASE PRINCIPAL DEL JUEGO: ClueGameGUI
@@ -88,6 +81,10 @@ class ClueGameGUI:
         self.root.geometry("950x700") 
         self.root.config(bg="#101010")
 
+        # Tiempos de arranque por fase (segundos); ver startup_report().
+        self.startup_times = {"import": IMPORTS_DONE - STARTUP_START}
+        self._startup_mark = time.perf_counter()
+
         # Configuración de estilos Cyberpunk
         style = ttk.Style()
         style.theme_use('clam')
@@ -103,13 +100,23 @@ class ClueGameGUI:
                   background=[('active', '#00ffe7')],
                   foreground=[('active', '#101010')])
 
-        self.initialize_game()
+        # Los casos se preparan en segundo plano para que reiniciar sea instantáneo.
+        # Cada partida queda en el registro de eventos, que se escribe desde otro hilo.
+        self.event_log = open_event_log()
+        self.engine = ClueEngine(pool=CasePool(), log=self.event_log)
+        self.catalog = load_catalog()
+        self.case_picker = random.Random()
+        self.solver = DeductionSolver()
+        self.advisor = MoveAdvisor()
+        # Las sugerencias se calculan en un hilo aparte para no congelar la interfaz.
+        self.advisor_worker = AdvisorWorker()
+        self.advisor_worker.start()
         
         # ======== Barra de estado (Abajo, Izquierda) ========
         status_frame = tk.Frame(root, bg="#101010", height=20)
         status_frame.pack(side="bottom", fill="x")
         
-        self.status_var = tk.StringVar(value="Turno: 0 / 10")
+        self.status_var = tk.StringVar()
         self.status_bar = tk.Label(status_frame, textvariable=self.status_var, bg="#101010", fg="#00ffe7",
                                    font=("Consolas", 11), anchor="w", padx=10) 
         self.status_bar.pack(side="left") 
@@ -150,18 +157,16 @@ class ClueGameGUI:
         
         # ======== Logo (AHORA PERMANENTEMENTE VISIBLE) ========
         # El logo es el primer elemento empaquetado, se mantiene fijo arriba en todas las vistas.
-        logo_path = os.path.join("Images", "Logo Clue.png")
-        if os.path.exists(logo_path):
-            img = Image.open(logo_path)
-            img.thumbnail((450, 200))
-            logo_img = ImageTk.PhotoImage(img)
-            self.logo = tk.Label(self.container, image=logo_img, bg="#101010")
-            self.logo.image = logo_img
-            self.logo.pack(pady=10) 
+        # Se empieza con el texto; la imagen reducida se carga con Tk sin pasar por Pillow.
+        self.logo = tk.Label(self.container, text="CLUE: Night City Protocol", font=("Consolas", 20, "bold"),
+                             fg="#00ffe7", bg="#101010")
+        self.logo.pack(pady=10)
+        if os.path.exists(LOGO_CACHE_PATH):
+            self.show_logo_image()
         else:
-            self.logo = tk.Label(self.container, text="CLUE: Night City Protocol", font=("Consolas", 20, "bold"),
-                     fg="#00ffe7", bg="#101010")
-            self.logo.pack(pady=10) 
+            # Falta la copia reducida: se crea después de pintar la primera ventana.
+            self.root.after(1, self.refresh_logo_cache)
+        self.mark_startup("asset")
         # =========================================================
 
         # *** Marco de Centrado Dinámico (Grid) ***
@@ -178,6 +183,18 @@ class ClueGameGUI:
         # Contenido del menú (texto de introducción y botones)
         tk.Label(self.menu_frame, text=self.get_intro_text(), fg="#00ffe7", bg="#101010",
                  font=("Consolas", 12), justify="left").pack(pady=10)
+        # Selector de dificultad (solo si hay catálogo de casos)
+        self.difficulty_var = tk.StringVar(value=ANY_DIFFICULTY)
+        if self.catalog is not None:
+            difficulty_frame = tk.Frame(self.menu_frame, bg="#101010")
+            difficulty_frame.pack(pady=5)
+            tk.Label(difficulty_frame, text="Dificultad:", fg="#00ffe7", bg="#101010",
+                     font=("Consolas", 12)).pack(side="left", padx=5)
+            cb_difficulty = ttk.Combobox(difficulty_frame, textvariable=self.difficulty_var, state="readonly",
+                                         values=[ANY_DIFFICULTY] + list(DIFFICULTIES), font=("Consolas", 11))
+            cb_difficulty.pack(side="left")
+            # Cambiar la dificultad empieza un caso nuevo de esa dificultad.
+            cb_difficulty.bind("<<ComboboxSelected>>", lambda e: self.restart_game())
         ttk.Button(self.menu_frame, text="Comenzar Investigación", command=lambda: self.show_frame("Investigation")).pack(pady=5)
         ttk.Button(self.menu_frame, text="Hacer Acusación", command=lambda: self.show_frame("Accusacion")).pack(pady=5)
         ttk.Button(self.menu_frame, text="Salir del Juego", command=self.root.quit).pack(pady=5)
@@ -185,20 +202,59 @@ class ClueGameGUI:
         # ======== Creación de pantallas secundarias ========
         self.create_investigation_screen()
         self.create_acusacion_screen()
+        self.update_status()
         
         self.show_frame("Menu") 
+        self.mark_startup("widgets")
+        # Los callbacks de inactividad se atienden en orden, así que este llega después
+        # de los redibujados pendientes: es el momento de la primera ventana pintada.
+        self.root.after_idle(lambda: self.mark_startup("first_paint"))
+        self.root.after(100, self.poll_hints)
+
+    # ========================
+    # ARRANQUE: LOGO Y TIEMPOS
+    # ========================
+
+    def show_logo_image(self):
+        logo_img = tk.PhotoImage(file=LOGO_CACHE_PATH)
+        self.logo.config(image=logo_img, text="")
+        self.logo.image = logo_img
+
+    def refresh_logo_cache(self):
+        if build_logo_cache():
+            self.show_logo_image()
+
+    def mark_startup(self, phase):
+        # Tiempo transcurrido desde la marca anterior, atribuido a la fase indicada.
+        now = time.perf_counter()
+        self.startup_times[phase] = now - self._startup_mark
+        self._startup_mark = now
+
+    def startup_report(self):
+        lines = ["Tiempos de arranque:"]
+        for phase, seconds in self.startup_times.items():
+            lines.append(f"  {phase:>12}: {seconds * 1000:8.1f} ms")
+        lines.append(f"  {'total':>12}: {sum(self.startup_times.values()) * 1000:8.1f} ms")
+        return "\n".join(lines)
     
     # ========================
     # INICIALIZAR JUEGO
     # ========================
     def initialize_game(self):
-        self.culprit = random.choice(SUSPECTS)
-        self.weapon = random.choice(WEAPONS)
-        self.location = random.choice(AREAS)
-        self.clues = generate_clues(self.culprit, self.weapon, self.location)
-        self.found_clues = []
-        self.turns = 0
-        self.max_turns = 10
+        # El estado y las reglas viven en el motor; la interfaz solo los muestra.
+        case_id = None
+        difficulty = DIFFICULTIES.get(self.difficulty_var.get())
+        if self.catalog is not None and difficulty is not None:
+            # Caso de la dificultad pedida, elegido en tiempo constante desde el catálogo.
+            case_id = self.catalog.pick(*difficulty, self.case_picker)
+        if case_id is not None:
+            # Los casos del catálogo no pasan por la reserva (que sigue la serie de ids de su
+            # semilla); se generan aquí, en el hilo de Tk, pero generar uno cuesta ~0.05 ms.
+            self.engine.load_case(generate_case(self.catalog.master_seed, case_id))
+        else:
+            self.engine.new_game()
+        self.solver = DeductionSolver()
+        self.advisor = MoveAdvisor()
 
     # ========================
     # SECCIONES DE PANTALLA
@@ -215,6 +271,11 @@ class ClueGameGUI:
                                    highlightbackground="#00ffe7", highlightcolor="#00ffe7")
         self.invest_text.pack(pady=10)
 
+        # Panel de sugerencias: lo rellena el consejero en segundo plano
+        self.hint_var = tk.StringVar(value="Sugerencias: calculando...")
+        tk.Label(self.invest_frame, textvariable=self.hint_var, bg="#101010", fg="#00ffe7",
+                 font=("Consolas", 10), justify="left", anchor="w").pack(fill="x", padx=20)
+
         # Marco para botones de navegación
         btn_frame = tk.Frame(self.invest_frame, bg="#101010")
         btn_frame.pack(pady=5)
@@ -224,6 +285,21 @@ class ClueGameGUI:
         ttk.Button(btn_frame, text="Investigar Armas", command=self.investigate_weapon_menu).grid(row=0, column=2, padx=5)
         ttk.Button(btn_frame, text="Volver al Menú", command=lambda: self.show_frame("Menu")).grid(row=0, column=3, padx=5)
 
+        # Paneles de selección: se crean una sola vez y luego solo se muestran u ocultan.
+        self.selection_panels = {
+            "area": self.create_selection_panel(AREAS, self.enter_area),
+            "suspect": self.create_selection_panel(SUSPECTS, self.enter_suspect),
+            "weapon": self.create_selection_panel(WEAPONS, self.enter_weapon),
+        }
+        self.active_panel = None
+
+    def create_selection_panel(self, names, command):
+        # Marco con un botón por entidad; no se empaqueta hasta que se necesita.
+        panel = tk.Frame(self.invest_frame, bg="#101010")
+        for name in names:
+            ttk.Button(panel, text=name, command=lambda n=name: command(n)).pack(pady=2)
+        return panel
+
     def create_acusacion_screen(self):
         # Frame para la pantalla de acusación
         self.acusacion_frame = tk.Frame(self.container, bg="#0f0f1a")
@@ -247,9 +323,12 @@ class ClueGameGUI:
         self.cb_location.grid(row=2, column=1, padx=5, pady=5)
 
         tk.Label(self.acusacion_frame, text="Pistas encontradas:", fg="#00ffe7", bg="#0f0f1a", font=("Consolas", 12, "bold")).pack(pady=(10,0))
-        # Área de texto para revisar pistas encontradas
-        self.acusacion_text = tk.Text(self.acusacion_frame, wrap="word", height=15, width=90, bg="#12131a", fg="#00ffe7", font=("Consolas", 11), bd=0)
-        self.acusacion_text.pack(pady=5, padx=10, fill="both", expand=True)
+        # Registro de pistas encontradas: solo se escribe lo nuevo desde la última vez
+        self.acusacion_log = ClueLogView(self.acusacion_frame, lambda p: f"- {p.text}",
+                                         "Aún no has encontrado pistas.\n", height=15,
+                                         wrap="word", width=90, bg="#12131a", fg="#00ffe7",
+                                         font=("Consolas", 11), bd=0)
+        self.acusacion_log.pack(pady=5, padx=10, fill="both", expand=True)
 
         ttk.Button(self.acusacion_frame, text="Hacer Acusación", command=self.make_accusation).pack(pady=8)
         ttk.Button(self.acusacion_frame, text="⬅ Volver al Menú", command=lambda: self.show_frame("Menu")).pack(pady=10)
@@ -293,124 +372,139 @@ class ClueGameGUI:
     # ========================
     
     def clear_investigation_buttons(self):
-        # Limpia los botones temporales de selección (áreas, sospechosos, armas)
-        for widget in self.invest_frame.winfo_children():
-            if isinstance(widget, ttk.Button) and widget.cget("text") in AREAS + SUSPECTS + WEAPONS:
-                widget.destroy()
+        # Oculta el panel de selección visible (áreas, sospechosos o armas)
+        if self.active_panel is not None:
+            self.active_panel.pack_forget()
+            self.active_panel = None
 
-    def investigate_area_menu(self):
-        # Prepara la pantalla para seleccionar un área a investigar.
+    def show_selection_panel(self, category, prompt):
+        # Prepara la pantalla para elegir qué investigar mostrando el panel ya creado.
         self.invest_text.delete("1.0", "end")
-        self.invest_text.insert("end", "Selecciona un área para investigar:\n")
+        self.invest_text.insert("end", prompt)
 
-        self.clear_investigation_buttons()
+        panel = self.selection_panels[category]
+        if panel is not self.active_panel:
+            self.clear_investigation_buttons()
+            panel.pack(pady=2)
+            self.active_panel = panel
 
-        for area in AREAS:
-            ttk.Button(self.invest_frame, text=area, command=lambda a=area: self.enter_area(a)).pack(pady=2)
+    def investigate_area_menu(self):
+        self.show_selection_panel("area", "Selecciona un área para investigar:\n")
 
     def investigate_suspect_menu(self):
-        # Prepara la pantalla para seleccionar un sospechoso a investigar.
-        self.invest_text.delete("1.0", "end")
-        self.invest_text.insert("end", "Selecciona un sospechoso para investigar:\n")
-
-        self.clear_investigation_buttons()
-
-        for suspect in SUSPECTS:
-            ttk.Button(self.invest_frame, text=suspect, command=lambda s=suspect: self.enter_suspect(s)).pack(pady=2)
+        self.show_selection_panel("suspect", "Selecciona un sospechoso para investigar:\n")
 
     def investigate_weapon_menu(self):
-        # Prepara la pantalla para seleccionar un arma a investigar.
-        self.invest_text.delete("1.0", "end")
-        self.invest_text.insert("end", "Selecciona un arma para investigar:\n")
-
-        self.clear_investigation_buttons()
-
-        for weapon in WEAPONS:
-            ttk.Button(self.invest_frame, text=weapon, command=lambda w=weapon: self.enter_weapon(w)).pack(pady=2)
+        self.show_selection_panel("weapon", "Selecciona un arma para investigar:\n")
 
     def enter_area(self, area):
         # Lógica de investigar un área: consume un turno y revela pistas.
-        if self.turns >= 10:
-            messagebox.showinfo("Fin de Turnos", "Has agotado tus movimientos. ¡Hora de hacer una acusación!")
+        known = len(self.engine.found_clues)
+        revealed = self.engine.enter_area(area)
+        if revealed is None:
+            self.show_out_of_turns()
             return
-        self.turns += 1
-        self.status_var.set(f"Turno: {self.turns} / {self.max_turns}")
-        self.invest_text.insert("end", f"\n--- {area} ---\n")
-        available = self.clues.get(area, [])
-        if not available:
-            self.invest_text.insert("end", "No hay pistas visibles aquí.\n")
+        for c in revealed:
+            self.solver.observe(c)
+        self.advisor.observe("area", area, revealed)
+        self.append_invest(f"\n--- {area} ---\n")
+        if not revealed:
+            self.append_invest("No hay pistas visibles aquí.\n")
         else:
-            num = min(2, len(available))
-            revealed = available[:num]
-            self.clues[area] = available[num:]
-            for c in revealed:
-                self.invest_text.insert("end", f"Pista encontrada: {c['text']}\n")
-                self.found_clues.append(c["text"])
-        self.invest_text.see("end") # Hace scroll al final del texto.
+            self.show_revealed(revealed, known)
+        self.update_status()
 
     def enter_suspect(self, suspect):
         # Lógica de investigar un sospechoso: consume un turno y busca pistas relacionadas.
-        if self.turns >= 10:
-            messagebox.showinfo("Fin de Turnos", "Has agotado tus movimientos. ¡Hora de hacer una acusación!")
+        known = len(self.engine.found_clues)
+        revealed = self.engine.enter_suspect(suspect)
+        if revealed is None:
+            self.show_out_of_turns()
             return
-        self.turns += 1
-        self.status_var.set(f"Turno: {self.turns} / {self.max_turns}")
-        self.invest_text.insert("end", f"\n--- Investigando a {suspect} ---\n")
-        
-        possible_clues = []
-        for area in AREAS:
-            for i, c in enumerate(self.clues[area]):
-                if suspect in c.get("text", ""):
-                    possible_clues.append((area, i, c))
-        
-        if not possible_clues:
-            self.invest_text.insert("end", f"No se encontró nada concluyente sobre {suspect}.\n")
+        self.solver.observe_lookup(True, SUSPECT_IDS[suspect], revealed)
+        self.advisor.observe("suspect", suspect, revealed)
+        self.append_invest(f"\n--- Investigando a {suspect} ---\n")
+        if not revealed:
+            self.append_invest(f"No se encontró nada concluyente sobre {suspect}.\n")
         else:
-            num = min(2, len(possible_clues))
-            for _, _, c in possible_clues[:num]:
-                self.invest_text.insert("end", f"Pista encontrada: {c['text']}\n")
-                self.found_clues.append(c["text"])
-                
-        self.invest_text.see("end")
+            self.show_revealed(revealed, known)
+        self.update_status()
 
     def enter_weapon(self, weapon):
         # Lógica de investigar un arma: consume un turno y busca pistas relacionadas.
-        if self.turns >= 10:
-            messagebox.showinfo("Fin de Turnos", "Has agotado tus movimientos. ¡Hora de hacer una acusación!")
+        known = len(self.engine.found_clues)
+        revealed = self.engine.enter_weapon(weapon)
+        if revealed is None:
+            self.show_out_of_turns()
             return
-        self.turns += 1
-        self.status_var.set(f"Turno: {self.turns} / {self.max_turns}")
-        self.invest_text.insert("end", f"\n--- Investigando el arma {weapon} ---\n")
-        possible_clues = []
-        for area in AREAS:
-            for c in self.clues[area]:
-                if weapon in c.get("text", ""):
-                    possible_clues.append(c)
-                    
-        if not possible_clues:
-            self.invest_text.insert("end", f"No se encontró información relevante sobre {weapon}.\n")
+        self.solver.observe_lookup(False, WEAPON_IDS[weapon], revealed)
+        self.advisor.observe("weapon", weapon, revealed)
+        self.append_invest(f"\n--- Investigando el arma {weapon} ---\n")
+        if not revealed:
+            self.append_invest(f"No se encontró información relevante sobre {weapon}.\n")
         else:
-            num = min(2, len(possible_clues))
-            revealed = possible_clues[:num]
-            for c in revealed:
-                self.invest_text.insert("end", f"Pista encontrada: {c['text']}\n")
-                self.found_clues.append(c["text"])
-                
-        self.invest_text.see("end")
+            self.show_revealed(revealed, known)
+        self.update_status()
+
+    def show_revealed(self, revealed, known):
+        # known: tamaño del registro antes de la acción; lo anterior ya se había visto.
+        new_ids = {c.id for c in self.engine.found_clues[known:]}
+        self.append_invest("".join(
+            f"Pista encontrada: {c.text}\n" if c.id in new_ids else f"Pista ya registrada: {c.text}\n"
+            for c in revealed))
+
+    def append_invest(self, text):
+        # Añade al final y descarta las líneas más antiguas si el texto crece demasiado.
+        self.invest_text.insert("end", text)
+        excess = int(self.invest_text.index("end-1c").split(".")[0]) - INVEST_MAX_LINES
+        if excess > 0:
+            self.invest_text.delete("1.0", f"{excess + 1}.0")
+        self.invest_text.see("end") # Hace scroll al final del texto.
+
+    def show_out_of_turns(self):
+        messagebox.showinfo("Fin de Turnos", "Has agotado tus movimientos. ¡Hora de hacer una acusación!")
+
+    def update_status(self):
+        # Muestra el turno y cuántas combinaciones (sospechoso, arma, lugar) siguen siendo posibles.
+        self.status_var.set(f"Turno: {self.engine.turns} / {self.engine.max_turns}    "
+                            f"Candidatos restantes: {self.solver.candidates()}")
+        self.request_hints()
+
+    # ========================
+    # SUGERENCIAS DEL CONSEJERO
+    # ========================
+
+    def hint_token(self):
+        # Identifica la situación para descartar sugerencias que ya no corresponden.
+        return (id(self.engine.case), self.engine.turns)
+
+    def request_hints(self):
+        self.hint_var.set("Sugerencias: calculando...")
+        position = self.advisor.position()
+        turns_left = self.engine.max_turns - self.engine.turns
+        self.advisor_worker.submit(self.hint_token(), self.advisor, position, turns_left)
+
+    def poll_hints(self):
+        # Revisa periódicamente si el hilo del consejero terminó (Tk no es seguro entre hilos).
+        result = self.advisor_worker.poll()
+        if result is not None and result[0] == self.hint_token():
+            _, ranking, worlds = result
+            if not ranking:
+                self.hint_var.set("Sugerencias: no quedan turnos, ¡hora de acusar!")
+            else:
+                lines = [f"Sugerencias (estimadas con {worlds} casos posibles):"]
+                for i, (action, win, _) in enumerate(ranking[:3], 1):
+                    lines.append(f"  {i}. {describe_action(action)}  ({win:.0%} de acertar)")
+                self.hint_var.set("\n".join(lines))
+        self.root.after(100, self.poll_hints)
 
     # ========================
     # LÓGICA DE ACUSACIÓN Y REINICIO
     # ========================
     def update_acusacion_pistas(self):
-        # Actualiza el área de texto de la pantalla de acusación con las pistas encontradas.
-        self.acusacion_text.config(state="normal")
-        self.acusacion_text.delete("1.0", "end")
-        if not self.found_clues:
-            self.acusacion_text.insert("end", "Aún no has encontrado pistas.\n")
-        else:
-            for p in self.found_clues:
-                self.acusacion_text.insert("end", f"- {p}\n")
-        self.acusacion_text.config(state="disabled")
+        # Actualiza la pantalla de acusación con las pistas encontradas desde la última vez
+        # (en una partida nueva el registro es otro y se empieza de cero).
+        self.acusacion_log.show(self.engine.found_clues)
     
     def make_accusation(self):
         # Procesa la acusación y muestra el resultado del caso.
@@ -421,16 +515,10 @@ class ClueGameGUI:
             messagebox.showwarning("Error", "Debes seleccionar una opción de cada categoría.")
             return
 
-        correct = (suspect == self.culprit and weapon == self.weapon and location == self.location)
-
-        # Genera la narrativa final del caso.
-        narrative = NARRATIVE_TEMPLATE.format(
-            culprit=self.culprit,
-            weapon=self.weapon,
-            location=self.location,
-            secondary_area=random.choice([a for a in AREAS if a != self.location]),
-            weather=random.choice(["una tormenta", "la noche silenciosa", "la tarde nublada"])
-        )
+        # El motor evalúa la acusación y genera la narrativa final del caso.
+        result = self.engine.make_accusation(suspect, weapon, location)
+        correct = result["correct"]
+        narrative = result["narrative"]
 
         # Muestra la ventana de resultado (victoria/derrota).
         result_window = tk.Toplevel(self.root)
@@ -453,8 +541,8 @@ class ClueGameGUI:
         if correct:
             narrative_label.insert("end", f"¡Correcto! Has resuelto el caso.\n\n{narrative}")
         else:
-            narrative_label.insert("end", f"Esa acusación no es correcta.\nEl culpable era {self.culprit}, "
-                                        f"con {self.weapon} en {self.location}.\n\n{narrative}")
+            narrative_label.insert("end", f"Esa acusación no es correcta.\nEl culpable era {result['culprit']}, "
+                                        f"con {result['weapon']} en {result['location']}.\n\n{narrative}")
         narrative_label.config(state="disabled")
 
         ttk.Button(result_window, text="Reiniciar Juego", command=lambda: [result_window.destroy(), self.restart_game()]).pack(pady=15)
@@ -462,7 +550,7 @@ class ClueGameGUI:
     def restart_game(self):
         # Reinicia el estado del juego.
         self.initialize_game()
-        self.status_var.set(f"Turno: {self.turns} / {self.max_turns}")
+        self.update_status()
         self.show_frame("Menu")
 
     def get_intro_text(self):
@@ -505,6 +593,30 @@ class ClueGameGUI:
 # EJECUTAR EL JUEGO
 # ========================
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clue: Night City Protocol")
+    parser.add_argument("--startup-timing", action="store_true",
+                        help="muestra cuánto tarda cada fase del arranque")
+    parser.add_argument("--profile", metavar="ARCHIVO", default=None,
+                        help="mide callbacks y motor y guarda el perfil al salir (ver instrument.py)")
+    parser.add_argument("--stall-ms", type=float, default=100.0,
+                        help="con --profile, bloqueo mínimo del bucle de Tk que se registra (ms)")
+    args = parser.parse_args()
+
     root = tk.Tk()
     app = ClueGameGUI(root)
-    root.mainloop()
\ No newline at end of file
+    if args.startup_timing:
+        root.after_idle(lambda: print(app.startup_report()))
+    if args.profile:
+        # Solo se importa si se pide: sin --profile el juego no lleva ninguna medición.
+        from instrument import Profiler, StallWatchdog, instrument_game
+        profiler = Profiler()
+        instrument_game(app, profiler)
+        watchdog = StallWatchdog(root, profiler, threshold=args.stall_ms / 1000)
+        watchdog.start()
+    root.mainloop()
+    if args.profile:
+        watchdog.stop()
+        profiler.export(args.profile)
+    app.engine.pool.close()
+    if app.event_log is not None:
+        app.event_log.close()
\ No newline at end of file
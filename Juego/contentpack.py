@@ -0,0 +1,171 @@
+import argparse
+import json
+import struct
+import time
+from array import array
+
+from engine import CLUE_KINDS, DEFAULT_PACK, ContentPack, generate_case, new_master_seed
+
+# ========================
+# PAQUETES DE CONTENIDO COMPILADOS
+# Un paquete se escribe en JSON (fácil de editar) y se compila a un archivo binario
+# compacto que el juego carga sin interpretar JSON:
+#   {"suspects": [...], "weapons": [...], "areas": [...], "weathers": [...],
+#    "narrative": "...", "templates": {"physical": [[falsa, verdadera], ...], ...}}
+# Las plantillas de pista usan {area} y {name}; la narrativa, {culprit}, {weapon},
+# {location}, {secondary_area} y {weather}. Cada tipo de pista puede tener varias
+# variantes.
+#
+# Formato del archivo:
+#   cabecera  <8sIII  magia, versión del formato, nº de cadenas, bytes del texto
+#   offsets   uint32 × (cadenas + 1)   inicio de cada cadena en el texto
+#   texto     utf-8                    todas las cadenas distintas, una sola vez
+#   secciones uint32                   ids de cadena: nº + ids de sospechosos, armas,
+#                                      áreas y climas; id de la narrativa; por cada tipo
+#                                      de pista, nº de variantes + (falsa, verdadera)
+# Las cadenas repetidas se guardan una vez (internado) y todo lo demás son ids.
+# ========================
+
+MAGIC = b"CLUEPACK"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIII")
+# Los ids de área y de entidad ocupan 14 bits en el código de una pista (pack_clue).
+MAX_ENTITIES = 1 << 14
+
+# ========================
+# COMPILACIÓN
+# ========================
+
+def validate(source):
+    for section in ("suspects", "weapons", "areas"):
+        names = source[section]
+        if not 2 <= len(names) <= MAX_ENTITIES:
+            raise ValueError(f"{section}: hacen falta entre 2 y {MAX_ENTITIES} nombres")
+        if len(set(names)) != len(names):
+            raise ValueError(f"{section}: hay nombres repetidos")
+    if not source["weathers"]:
+        raise ValueError("weathers: hace falta al menos un clima")
+    for kind in CLUE_KINDS:
+        variants = source["templates"].get(kind)
+        if not variants:
+            raise ValueError(f"templates: falta el tipo de pista {kind!r}")
+        for variant in variants:
+            if len(variant) != 2:
+                raise ValueError(f"templates.{kind}: cada variante es [falsa, verdadera]")
+            for template in variant:
+                template.format(area="", name="")
+    source["narrative"].format(culprit="", weapon="", location="", secondary_area="", weather="")
+
+def compile_pack(source, path):
+    # Escribe el paquete (dict con el formato de arriba) en path.
+    validate(source)
+    strings = {}
+
+    def intern(text):
+        return strings.setdefault(text, len(strings))
+
+    sections = array("I")
+    for section in ("suspects", "weapons", "areas", "weathers"):
+        sections.append(len(source[section]))
+        sections.extend(intern(name) for name in source[section])
+    sections.append(intern(source["narrative"]))
+    for kind in CLUE_KINDS:
+        variants = source["templates"][kind]
+        sections.append(len(variants))
+        for false_text, true_text in variants:
+            sections.extend((intern(false_text), intern(true_text)))
+
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = array("I", [0])
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(encoded), offsets[-1]))
+        f.write(offsets.tobytes())
+        f.write(b"".join(encoded))
+        f.write(sections.tobytes())
+
+def pack_source(pack):
+    # Dict de origen de un ContentPack (para exportar el contenido por defecto).
+    return {
+        "suspects": list(pack.suspects),
+        "weapons": list(pack.weapons),
+        "areas": list(pack.areas),
+        "weathers": list(pack.weathers),
+        "narrative": pack.narrative,
+        "templates": {CLUE_KINDS[kind]: [list(v) for v in variants] for kind, variants in pack.templates.items()},
+    }
+
+# ========================
+# CARGA
+# ========================
+
+def load_pack(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, n_strings, text_size = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path} no es un paquete de contenido compatible")
+    pos = HEADER.size
+    offsets = array("I")
+    offsets.frombytes(data[pos:pos + 4 * (n_strings + 1)])
+    pos += 4 * (n_strings + 1)
+    text = data[pos:pos + text_size]
+    pos += text_size
+    strings = [text[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(n_strings)]
+    sections = array("I")
+    sections.frombytes(data[pos:])
+
+    ids = iter(sections)
+
+    def read_list():
+        n = next(ids)
+        return [strings[next(ids)] for _ in range(n)]
+
+    suspects, weapons, areas, weathers = read_list(), read_list(), read_list(), read_list()
+    narrative = strings[next(ids)]
+    templates = {}
+    for kind in range(len(CLUE_KINDS)):
+        templates[kind] = [(strings[next(ids)], strings[next(ids)]) for _ in range(next(ids))]
+    return ContentPack(suspects, weapons, areas, templates, weathers, narrative)
+
+# ========================
+# LÍNEA DE COMANDOS
+# ========================
+
+def main():
+    parser = argparse.ArgumentParser(description="Compila y consulta paquetes de contenido")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("compile", help="compila un paquete JSON")
+    build.add_argument("source", help="paquete en JSON (o 'default' para el contenido de serie)")
+    build.add_argument("output", help="archivo compilado (.cpk)")
+    info = commands.add_parser("info", help="resume un paquete compilado y mide la generación de casos")
+    info.add_argument("path")
+    info.add_argument("-n", "--cases", type=int, default=10000, help="casos a generar para medir")
+    args = parser.parse_args()
+
+    if args.command == "compile":
+        if args.source == "default":
+            source = pack_source(DEFAULT_PACK)
+        else:
+            with open(args.source, encoding="utf-8") as f:
+                source = json.load(f)
+        compile_pack(source, args.output)
+        print(f"Paquete compilado en {args.output}")
+        return
+
+    start = time.perf_counter()
+    pack = load_pack(args.path)
+    loaded = time.perf_counter() - start
+    variants = sum(len(v) for v in pack.templates.values())
+    print(f"{len(pack.suspects)} sospechosos, {len(pack.weapons)} armas, {len(pack.areas)} áreas, "
+          f"{variants} plantillas de pista ({loaded * 1000:.1f} ms al cargar)")
+    seed = new_master_seed()
+    start = time.perf_counter()
+    for case_id in range(args.cases):
+        generate_case(seed, case_id, pack=pack)
+    elapsed = time.perf_counter() - start
+    print(f"Generación: {elapsed / args.cases * 1e6:.1f} µs por caso")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,683 @@
+import random
+import secrets
+import struct
+from array import array
+from collections import Counter
+from functools import lru_cache
+from itertools import islice
+
+# ========================
+# DATOS PRINCIPALES DEL JUEGO
+# ========================
+
+SUSPECTS = ["Hacker", "Jefe seguridad", "Ejecutiva", "Mercenario", "Investigadora"]
+WEAPONS = ["Mantis Blades", "Monowire", "Cuchillo", "Katana", "Pistola"]
+AREAS = ["Laboratorio Biologico", "Sala Seguridad", "Penthouse", "Cafetería", "Taller de prototipos"]
+
+# Plantilla para generar el resultado final del caso
+NARRATIVE_TEMPLATE = (
+    "El culpable, {culprit}, fue detectado en {location}. "
+    "Usó su {weapon} para cometer el crimen. "
+    "Algunos testigos reportaron movimientos sospechosos cerca de {secondary_area}. "
+    "El hecho ocurrió durante {weather}."
+)
+
+WEATHERS = ["una tormenta", "la noche silenciosa", "la tarde nublada"]
+
+# Versión del generador de casos: cambia si el mismo (semilla, id) deja de producir el
+# mismo caso, para invalidar catálogos y corpus creados con la versión anterior.
+# 2: las entidades de las pistas falsas se eligen con sample_other (O(1)).
+GENERATOR_VERSION = 2
+
+MAX_TURNS = 10
+DECOY_CLUES = 8
+CLUES_PER_AREA_VISIT = 2
+CLUES_PER_LOOKUP = 2
+
+# Identificadores numéricos de cada entidad (posición en su lista)
+SUSPECT_IDS = {name: i for i, name in enumerate(SUSPECTS)}
+WEAPON_IDS = {name: i for i, name in enumerate(WEAPONS)}
+AREA_IDS = {name: i for i, name in enumerate(AREAS)}
+
+# Tipos de pista
+PHYSICAL, ACCESS, SOCIAL, ITEM = range(4)
+CLUE_KINDS = ["physical", "access", "social", "item"]
+SUSPECT_KINDS = (ACCESS, SOCIAL)
+
+# Plantillas de texto por tipo de pista: (falsa, verdadera).
+# {name} es el sospechoso o arma que menciona la pista.
+CLUE_TEMPLATES = {
+    PHYSICAL: ("En {area} hay señales que parecen de un {name}, pero no es concluyente.",
+               "Se encontraron rastros en {area} que podrían indicar que se usó un {name}."),
+    ACCESS: ("Al parecer {name} estuvo en {area}, aunque no hay certeza.",
+             "Se registró actividad reciente de alguien similar a {name} en {area}."),
+    SOCIAL: ("Se rumorea que {name} estaba cerca de {area}, pero no es seguro.",
+             "Un testigo vio a alguien con características de {name} cerca de {area}."),
+    ITEM: ("Hay un objeto que parece vinculado a un {name}, aunque no es definitivo.",
+           "Se encontró un objeto relacionado con {name} dentro de {area}."),
+}
+
+# ========================
+# PAQUETES DE CONTENIDO
+# Reparto, lugares y textos de un juego. El motor trabaja siempre con ids (posiciones en
+# las listas del paquete) y solo usa los nombres para mostrar. DEFAULT_PACK es el
+# contenido de arriba; contentpack.py carga paquetes compilados con repartos grandes y
+# varias plantillas por tipo de pista.
+# ========================
+
+class ContentPack:
+    def __init__(self, suspects, weapons, areas, templates, weathers, narrative):
+        # templates: {tipo de pista: [(falsa, verdadera), ...]}
+        self.suspects = suspects
+        self.weapons = weapons
+        self.areas = areas
+        self.templates = templates
+        self.weathers = weathers
+        self.narrative = narrative
+        self.suspect_ids = {name: i for i, name in enumerate(suspects)}
+        self.weapon_ids = {name: i for i, name in enumerate(weapons)}
+        self.area_ids = {name: i for i, name in enumerate(areas)}
+
+DEFAULT_PACK = ContentPack(SUSPECTS, WEAPONS, AREAS, {kind: [tpl] for kind, tpl in CLUE_TEMPLATES.items()},
+                           WEATHERS, NARRATIVE_TEMPLATE)
+
+def sample_other(n, exclude, rng):
+    # Id uniforme en range(n) distinto de exclude, en tiempo constante (sin filtrar listas).
+    return (exclude + 1 + rng.randrange(n - 1)) % n
+
+# ========================
+# REPRESENTACIÓN COMPACTA DE PISTAS
+# Cada pista se guarda como un entero: bit 0 = verdadera, bits 1-3 = tipo,
+# bits 4-17 = área, bits 18+ = entidad mencionada (sospechoso o arma según el tipo).
+# El texto no se genera al crear el caso, solo cuando la pista se muestra.
+# ========================
+
+def pack_clue(kind, area_id, is_true, entity_id):
+    return entity_id << 18 | area_id << 4 | kind << 1 | is_true
+
+@lru_cache(maxsize=4096)
+def render_clue(kind, area_id, is_true, entity_id, pack=DEFAULT_PACK):
+    # Texto de la pista; se cachea porque las combinaciones que se repiten son pocas.
+    # Si el paquete tiene varias plantillas para el tipo, la elige la propia pista.
+    names = pack.suspects if kind in SUSPECT_KINDS else pack.weapons
+    variants = pack.templates[kind]
+    template = variants[(area_id + entity_id) % len(variants)][is_true]
+    return template.format(area=pack.areas[area_id], name=names[entity_id])
+
+class Clue:
+    __slots__ = ("id", "kind", "area", "entity", "is_true", "pack")
+
+    def __init__(self, clue_id, code, pack=DEFAULT_PACK):
+        self.id = clue_id
+        self.pack = pack
+        self.is_true = bool(code & 1)
+        self.kind = code >> 1 & 0x7
+        self.area = code >> 4 & 0x3FFF
+        self.entity = code >> 18
+
+    @property
+    def suspect(self):
+        return self.entity if self.kind in SUSPECT_KINDS else None
+
+    @property
+    def weapon(self):
+        return None if self.kind in SUSPECT_KINDS else self.entity
+
+    @property
+    def text(self):
+        return render_clue(self.kind, self.area, self.is_true, self.entity, self.pack)
+
+# ========================
+# FUNCIONES PARA GENERAR PISTAS DIGERIBLES
+# Devuelven la pista empaquetada; las falsas mencionan otra entidad elegida con rng.
+# Reciben ids (área y entidad real) y el paquete de contenido.
+# ========================
+
+def clue_physical(area_id, weapon_id, is_true, rng, pack=DEFAULT_PACK):
+    if not is_true:
+        weapon_id = sample_other(len(pack.weapons), weapon_id, rng)
+    return pack_clue(PHYSICAL, area_id, is_true, weapon_id)
+
+def clue_access(area_id, culprit_id, is_true, rng, pack=DEFAULT_PACK):
+    if not is_true:
+        culprit_id = sample_other(len(pack.suspects), culprit_id, rng)
+    return pack_clue(ACCESS, area_id, is_true, culprit_id)
+
+def clue_social(area_id, culprit_id, is_true, rng, pack=DEFAULT_PACK):
+    if not is_true:
+        culprit_id = sample_other(len(pack.suspects), culprit_id, rng)
+    return pack_clue(SOCIAL, area_id, is_true, culprit_id)
+
+def clue_item(area_id, weapon_id, is_true, rng, pack=DEFAULT_PACK):
+    if not is_true:
+        weapon_id = sample_other(len(pack.weapons), weapon_id, rng)
+    return pack_clue(ITEM, area_id, is_true, weapon_id)
+
+CLUE_FUNCTIONS = [clue_physical, clue_access, clue_social, clue_item]
+
+# ========================
+# MAZO DE PISTAS CON ÍNDICE POR ENTIDAD
+# Las pistas se guardan agrupadas por área en un array de enteros; el id de una pista
+# es su posición, así que los ids siguen el orden de las áreas. Al empezar a jugar se
+# crean los objetos Clue y los índices por sospechoso y arma, de modo que buscar las
+# pistas de una entidad cuesta O(coincidencias). Un mazo archivado ocupa solo el array.
+#
+# fork() copia un mazo en juego sin duplicarlo: las dos copias comparten los objetos
+# Clue y los índices, y la primera que retira pistas de un área se hace antes su propia
+# copia de los índices (copia al escribir). Las búsquedas por entidad no copian nada.
+# ========================
+
+def area_start_from_counts(counts, n_areas):
+    # Inicio de cada área en el array de códigos a partir de {id de área: nº de pistas}.
+    # Se rellena por tramos (repetición de arrays en C): el coste depende de las áreas con
+    # pistas, no del total de áreas del paquete.
+    area_start = array("H", [0]) * (n_areas + 1)
+    area_ids = sorted(counts)
+    total = 0
+    for i, area_id in enumerate(area_ids):
+        total += counts[area_id]
+        end = area_ids[i + 1] if i + 1 < len(area_ids) else n_areas
+        area_start[area_id + 1:end + 1] = array("H", [total]) * (end - area_id)
+    return area_start
+
+class ClueDeck:
+    __slots__ = ("codes", "area_start", "pack", "taken", "clues", "by_suspect", "by_weapon", "_owned")
+
+    def __init__(self, codes, area_start, pack=DEFAULT_PACK):
+        self.codes = codes
+        self.area_start = area_start
+        self.pack = pack
+        self.clues = None
+
+    @classmethod
+    def from_areas(cls, clues_by_area, pack=DEFAULT_PACK):
+        # clues_by_area: {id de área: [códigos]}; solo hace falta incluir las áreas con pistas.
+        codes = array("I")
+        for area_id in sorted(clues_by_area):
+            codes.extend(clues_by_area[area_id])
+        counts = {area_id: len(clues) for area_id, clues in clues_by_area.items()}
+        return cls(codes, area_start_from_counts(counts, len(pack.areas)), pack)
+
+    @classmethod
+    def from_codes(cls, codes, pack=DEFAULT_PACK):
+        # Mazo a partir de un array de códigos ya agrupados por área (como deck.codes).
+        counts = Counter(code >> 4 & 0x3FFF for code in codes)
+        return cls(codes, area_start_from_counts(counts, len(pack.areas)), pack)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def activate(self):
+        # Materializa las pistas y construye los índices (una sola vez por partida).
+        if self.clues is not None:
+            return
+        self.clues = [Clue(i, code, self.pack) for i, code in enumerate(self.codes)]
+        self.taken = bytearray(len(self.area_start) - 1)
+        # Índices dispersos {entidad: {id: pista}}: su tamaño no depende del reparto.
+        self.by_suspect = {}
+        self.by_weapon = {}
+        for c in self.clues:
+            index = self.by_suspect if c.kind in SUSPECT_KINDS else self.by_weapon
+            index.setdefault(c.entity, {})[c.id] = c
+        self._owned = True
+
+    def fork(self):
+        # Copia independiente del mazo; los índices se comparten hasta que uno de los dos
+        # retire pistas (ver _own).
+        other = ClueDeck(self.codes, self.area_start, self.pack)
+        if self.clues is None:
+            return other
+        other.clues = self.clues
+        other.taken = bytearray(self.taken)
+        other.by_suspect = self.by_suspect
+        other.by_weapon = self.by_weapon
+        self._owned = other._owned = False
+        return other
+
+    def _own(self):
+        # Copia propia de los índices antes de modificarlos (solo si se comparten).
+        self.by_suspect = {entity: dict(clues) for entity, clues in self.by_suspect.items()}
+        self.by_weapon = {entity: dict(clues) for entity, clues in self.by_weapon.items()}
+        self._owned = True
+
+    def release(self):
+        # Vuelve a la forma archivada (solo el array de códigos); el progreso se pierde.
+        self.clues = None
+        self.taken = self.by_suspect = self.by_weapon = None
+
+    def restore(self, taken):
+        # Reconstruye el mazo con taken[a] pistas ya retiradas de cada área.
+        self.release()
+        self.activate()
+        for area_id, n in enumerate(taken):
+            for c in self.remaining(area_id)[:n]:
+                index = self.by_suspect if c.kind in SUSPECT_KINDS else self.by_weapon
+                del index[c.entity][c.id]
+            self.taken[area_id] = n
+
+    def remaining(self, area_id):
+        # Pistas que aún quedan en el área, en orden de revelación.
+        self.activate()
+        start = self.area_start[area_id] + self.taken[area_id]
+        return self.clues[start:self.area_start[area_id + 1]]
+
+    def take_from_area(self, area, n):
+        # Retira las primeras n pistas del área y las saca de los índices.
+        area_id = self.pack.area_ids[area]
+        taken = self.remaining(area_id)[:n]
+        if taken and not self._owned:
+            self._own()
+        self.taken[area_id] += len(taken)
+        for c in taken:
+            index = self.by_suspect if c.kind in SUSPECT_KINDS else self.by_weapon
+            del index[c.entity][c.id]
+        return taken
+
+    def find_suspect(self, suspect, n):
+        # Primeras n pistas que mencionan al sospechoso (sin retirarlas).
+        self.activate()
+        return list(islice(self.by_suspect.get(self.pack.suspect_ids[suspect], {}).values(), n))
+
+    def find_weapon(self, weapon, n):
+        # Primeras n pistas que mencionan el arma (sin retirarlas).
+        self.activate()
+        return list(islice(self.by_weapon.get(self.pack.weapon_ids[weapon], {}).values(), n))
+
+def generate_clues(culprit, weapon, location, seed=None, rng=None, decoys=DECOY_CLUES, pack=DEFAULT_PACK):
+    # Usa el generador recibido (o uno nuevo a partir de seed); nunca el estado global.
+    # decoys: número de pistas falsas (cambiarlo sirve para probar el balance).
+    # El coste no depende del tamaño del reparto: todo se elige por id en tiempo constante.
+    if rng is None:
+        rng = random.Random(seed)
+    culprit_id = pack.suspect_ids[culprit]
+    weapon_id = pack.weapon_ids[weapon]
+    location_id = pack.area_ids[location]
+    n_areas = len(pack.areas)
+    clues_by_area = {}
+
+    clues_by_area[location_id] = [clue_physical(location_id, weapon_id, True, rng, pack),
+                                  clue_item(location_id, weapon_id, True, rng, pack)]
+    random_area = sample_other(n_areas, location_id, rng)
+    clues_by_area[random_area] = [clue_access(random_area, culprit_id, True, rng, pack),
+                                  clue_social(random_area, culprit_id, True, rng, pack)]
+
+    for _ in range(decoys):
+        tpl = rng.choice(CLUE_FUNCTIONS)
+        area_id = rng.randrange(n_areas)
+        if tpl in (clue_physical, clue_item):
+            clue = tpl(area_id, weapon_id, False, rng, pack)
+        else:
+            clue = tpl(area_id, culprit_id, False, rng, pack)
+        clues_by_area.setdefault(area_id, []).append(clue)
+
+    for area_id in sorted(clues_by_area):
+        rng.shuffle(clues_by_area[area_id])
+    return ClueDeck.from_areas(clues_by_area, pack)
+
+# ========================
+# CASOS REPRODUCIBLES
+# Cada caso tiene sus propios generadores, derivados solo de (semilla maestra, id de caso):
+# el mismo par produce exactamente el mismo caso en cualquier proceso y en cualquier orden,
+# así que generar en paralelo por bloques da lo mismo que hacerlo en un solo hilo.
+# ========================
+
+def new_master_seed():
+    return secrets.randbits(64)
+
+def case_rng(master_seed, case_id, stream="case"):
+    # "case" genera el caso; "play" se usa durante la partida (narrativa, jugadores guionizados).
+    return random.Random(f"{stream}:{master_seed}:{case_id}")
+
+class Case:
+    __slots__ = ("master_seed", "case_id", "culprit", "weapon", "location", "clues")
+
+    def __init__(self, master_seed, case_id, culprit, weapon, location, clues):
+        self.master_seed = master_seed
+        self.case_id = case_id
+        self.culprit = culprit
+        self.weapon = weapon
+        self.location = location
+        self.clues = clues
+
+def generate_case(master_seed, case_id, decoys=DECOY_CLUES, pack=DEFAULT_PACK):
+    rng = case_rng(master_seed, case_id)
+    culprit = rng.choice(pack.suspects)
+    weapon = rng.choice(pack.weapons)
+    location = rng.choice(pack.areas)
+    clues = generate_clues(culprit, weapon, location, rng=rng, decoys=decoys, pack=pack)
+    return Case(master_seed, case_id, culprit, weapon, location, clues)
+
+# ========================
+# REGISTRO DE PISTAS ENCONTRADAS
+# Las búsquedas por sospechoso o arma no retiran pistas, así que la misma pista puede
+# revelarse varias veces. El registro guarda cada una una sola vez, en el orden en que
+# apareció por primera vez; como solo crece, una vista puede pedir lo añadido desde la
+# última vez que se dibujó en lugar de redibujarlo todo.
+# ========================
+
+class ClueLog:
+    __slots__ = ("entries", "_ids")
+
+    def __init__(self):
+        self.entries = []
+        self._ids = set()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __getitem__(self, index):
+        return self.entries[index]
+
+    def __contains__(self, clue):
+        return clue.id in self._ids
+
+    def add(self, clues):
+        # Añade las pistas que aún no estaban y devuelve solo esas.
+        new = []
+        for c in clues:
+            if c.id not in self._ids:
+                self._ids.add(c.id)
+                new.append(c)
+        self.entries.extend(new)
+        return new
+
+    def copy(self):
+        other = ClueLog()
+        other.entries = list(self.entries)
+        other._ids = set(self._ids)
+        return other
+
+# ========================
+# INSTANTÁNEAS DE PARTIDA
+# Estado completo de una partida en bytes (ClueEngine.snapshot / load_snapshot):
+#   cabecera  <4sBBQQHHHHHHHH  magia, versión, flags, semilla maestra, id de caso,
+#                              culpable, arma y lugar (ids), turnos, máximo de turnos,
+#                              pistas por visita, nº de pistas, nº de pistas encontradas
+#   códigos   uint32 × pistas         el mazo tal cual (no hace falta regenerar el caso)
+#   retiradas uint8 por área con pistas, en orden de área
+#   halladas  uint16 × encontradas    ids en el orden en que se encontraron
+#   azar      si SNAP_RNG: estado del generador de la partida (625 × uint32) y, si
+#             SNAP_GAUSS, el double pendiente de gauss(). Si el generador no se llegó a
+#             usar no se guarda: se vuelve a sembrar a partir del caso.
+# Una partida por defecto ocupa ~90 bytes. El paquete de contenido no va incluido: se
+# indica al restaurar y debe ser el mismo con el que se creó el caso. Al restaurar se
+# comprueba que cada id (culpable, arma, lugar y el área y la entidad de cada pista)
+# exista en ese paquete; si no, ValueError.
+# ========================
+
+SNAPSHOT_MAGIC = b"CLUS"
+SNAPSHOT_VERSION = 2
+SNAPSHOT_HEADER = struct.Struct("<4sBBQQHHHHHHHH")
+SNAP_RNG = 1
+SNAP_GAUSS = 2
+RNG_WORDS = 625
+
+# ========================
+# MOTOR DEL JUEGO: ClueEngine
+# Contiene el estado de una partida y todas las reglas, sin depender de Tk.
+# Cada acción devuelve su resultado para que la interfaz (o un script) lo muestre.
+# ========================
+
+class ClueEngine:
+    def __init__(self, max_turns=MAX_TURNS, master_seed=None, pool=None, log=None,
+                 clues_per_visit=CLUES_PER_AREA_VISIT, pack=DEFAULT_PACK):
+        # pool: reserva opcional de casos pre-generados (ver casepool.CasePool).
+        # log: registro de eventos opcional (ver eventlog.EventLog); cada caso es una sesión.
+        # clues_per_visit: pistas que revela cada visita a un área.
+        # pack: contenido con el que se generan los casos nuevos (ver ContentPack).
+        self.max_turns = max_turns
+        self.clues_per_visit = clues_per_visit
+        self.default_pack = pack
+        self.pool = pool
+        self.log = log
+        self.log_session = None
+        if pool is not None:
+            master_seed = pool.master_seed
+        self.master_seed = new_master_seed() if master_seed is None else master_seed
+        self.next_case_id = 0
+        self.new_game()
+
+    def new_game(self, case_id=None):
+        # Carga un caso nuevo (el siguiente de la serie, o uno concreto para repetirlo)
+        # y reinicia el estado de la partida.
+        if case_id is None and self.pool is not None:
+            self.load_case(self.pool.get())
+            return
+        if case_id is None:
+            case_id = self.next_case_id
+        self.next_case_id = case_id + 1
+        self.load_case(generate_case(self.master_seed, case_id, pack=self.default_pack))
+
+    def load_case(self, case):
+        self._set_case(case)
+        if self.log is not None:
+            self.log_session = self.log.start_session(case)
+
+    def _set_case(self, case):
+        self.case = case
+        self.culprit = case.culprit
+        self.weapon = case.weapon
+        self.location = case.location
+        self.clues = case.clues
+        self.pack = case.clues.pack
+        # El generador de la partida se crea al usarlo (ver rng): muchas partidas no lo usan.
+        self._rng = None
+        self._rng_state = None
+        self.found_clues = ClueLog()
+        self.turns = 0
+
+    @property
+    def rng(self):
+        # Generador de la partida: flujo "play" del caso o, tras fork/load_snapshot, el
+        # estado heredado.
+        rng = self._rng
+        if rng is None:
+            if self._rng_state is None:
+                rng = case_rng(self.case.master_seed, self.case.case_id, "play")
+            else:
+                rng = random.Random()
+                rng.setstate(self._rng_state)
+            self._rng = rng
+        return rng
+
+    def progress(self):
+        # Estado de la partida en forma compacta: (turnos, pistas retiradas por área,
+        # ids de las pistas encontradas en orden). Junto con el caso basta para resume().
+        self.clues.activate()
+        return self.turns, bytes(self.clues.taken), array("B", (c.id for c in self.found_clues))
+
+    def resume(self, case, turns, taken, found_ids, log_session=None):
+        # Continúa una partida de la que solo se guardó progress() (y, si hay registro de
+        # eventos, el id de su sesión). Sin log_session la partida continúa sin registrarse:
+        # una sesión nueva empezaría a mitad de partida y no se podría repetir con replay.
+        self._set_case(case)
+        self.log_session = log_session if self.log is not None else None
+        self.clues.restore(taken)
+        self.turns = turns
+        self.found_clues.add([self.clues.clues[i] for i in found_ids])
+
+    # ========================
+    # INSTANTÁNEAS Y BIFURCACIONES
+    # ========================
+
+    def _rng_snapshot(self):
+        # Estado del generador, o None si aún está recién sembrado.
+        return self._rng.getstate() if self._rng is not None else self._rng_state
+
+    def snapshot(self):
+        # Partida completa en bytes (formato en INSTANTÁNEAS DE PARTIDA).
+        deck, pack = self.clues, self.pack
+        codes = deck.codes
+        area_ids = sorted({code >> 4 & 0x3FFF for code in codes})
+        taken = bytes(deck.taken[a] for a in area_ids) if deck.clues is not None else bytes(len(area_ids))
+        found = array("H", (c.id for c in self.found_clues))
+        flags = 0
+        tail = []
+        rng_state = self._rng_snapshot()
+        if rng_state is not None:
+            flags |= SNAP_RNG
+            tail.append(array("I", rng_state[1]).tobytes())
+            if rng_state[2] is not None:
+                flags |= SNAP_GAUSS
+                tail.append(struct.pack("<d", rng_state[2]))
+        header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, flags, self.case.master_seed,
+                                      self.case.case_id, pack.suspect_ids[self.culprit],
+                                      pack.weapon_ids[self.weapon], pack.area_ids[self.location],
+                                      self.turns, self.max_turns, self.clues_per_visit, len(codes),
+                                      len(found))
+        return b"".join([header, codes.tobytes(), taken, found.tobytes(), *tail])
+
+    def load_snapshot(self, data, pack=None, log_session=None):
+        # Continúa la partida guardada con snapshot(), incluidos el máximo de turnos y las
+        # pistas por visita. pack: el del caso (por defecto, el del motor). log_session: sesión del
+        # registro de eventos en la que seguir anotando (ver resume).
+        pack = self.default_pack if pack is None else pack
+        if len(data) < SNAPSHOT_HEADER.size:
+            raise ValueError("no es una instantánea de partida compatible")
+        (magic, version, flags, master_seed, case_id, culprit, weapon, location, turns, max_turns,
+         clues_per_visit, n_codes, n_found) = SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError("no es una instantánea de partida compatible")
+        pos = SNAPSHOT_HEADER.size
+        codes = array("I")
+        codes.frombytes(data[pos:pos + 4 * n_codes])
+        pos += 4 * n_codes
+        counts = Counter(code >> 4 & 0x3FFF for code in codes)
+        area_ids = sorted(counts)
+        size = pos + len(area_ids) + 2 * n_found
+        if flags & SNAP_RNG:
+            size += 4 * RNG_WORDS + (8 if flags & SNAP_GAUSS else 0)
+        if len(codes) != n_codes or len(data) != size:
+            raise ValueError("la instantánea está incompleta")
+
+        # Todos los ids deben existir en el paquete; si no, la instantánea es de otro.
+        n_suspects, n_weapons, n_areas = len(pack.suspects), len(pack.weapons), len(pack.areas)
+        mismatch = ValueError("la instantánea no corresponde a este paquete de contenido")
+        if culprit >= n_suspects or weapon >= n_weapons or location >= n_areas:
+            raise mismatch
+        last_area = 0
+        for code in codes:
+            kind, area_id, entity = code >> 1 & 0x7, code >> 4 & 0x3FFF, code >> 18
+            if (kind >= len(CLUE_KINDS) or area_id >= n_areas or area_id < last_area
+                    or entity >= (n_suspects if kind in SUSPECT_KINDS else n_weapons)):
+                raise mismatch
+            last_area = area_id
+        taken = bytearray(n_areas)
+        for area_id, n in zip(area_ids, data[pos:pos + len(area_ids)]):
+            if n > counts[area_id]:
+                raise ValueError("la instantánea está dañada")
+            taken[area_id] = n
+        pos += len(area_ids)
+        found = array("H")
+        found.frombytes(data[pos:pos + 2 * n_found])
+        pos += 2 * n_found
+        if any(i >= n_codes for i in found):
+            raise ValueError("la instantánea está dañada")
+
+        deck = ClueDeck.from_codes(codes, pack)
+        case = Case(master_seed, case_id, pack.suspects[culprit], pack.weapons[weapon],
+                    pack.areas[location], deck)
+        self.max_turns = max_turns
+        self.clues_per_visit = clues_per_visit
+        self.resume(case, turns, taken, found, log_session)
+        if flags & SNAP_RNG:
+            words = array("I")
+            words.frombytes(data[pos:pos + 4 * RNG_WORDS])
+            pos += 4 * RNG_WORDS
+            gauss = struct.unpack_from("<d", data, pos)[0] if flags & SNAP_GAUSS else None
+            self._rng_state = (3, tuple(words), gauss)
+
+    def fork(self):
+        # Copia independiente de la partida en curso, para explorar jugadas (IA que simula
+        # partidas, análisis de "¿y si...?"). El caso y las pistas se comparten y el mazo
+        # se copia al escribir (ClueDeck.fork); el generador se copia solo si la copia lo
+        # usa. La copia no escribe en el registro de eventos ni usa la reserva de casos.
+        other = object.__new__(ClueEngine)
+        other.__dict__.update(self.__dict__)
+        other.log = None
+        other.log_session = None
+        other.pool = None
+        case = self.case
+        other.clues = self.clues.fork()
+        other.case = Case(case.master_seed, case.case_id, case.culprit, case.weapon, case.location,
+                          other.clues)
+        other.found_clues = self.found_clues.copy()
+        other._rng = None
+        other._rng_state = self._rng_snapshot()
+        return other
+
+    def out_of_turns(self):
+        return self.turns >= self.max_turns
+
+    def _spend_turn(self):
+        # Consume un turno. Devuelve False si ya no quedan movimientos.
+        if self.out_of_turns():
+            return False
+        self.turns += 1
+        return True
+
+    def _reveal(self, clues):
+        # Las pistas ya registradas se devuelven igualmente, pero no se repiten en el registro.
+        self.found_clues.add(clues)
+        return clues
+
+    # ========================
+    # ACCIONES DE INVESTIGACION
+    # Devuelven la lista de pistas reveladas, o None si no quedan turnos.
+    # ========================
+
+    def enter_area(self, area):
+        # Investigar un área: revela (y retira) las primeras pistas del área.
+        revealed = None
+        if self._spend_turn():
+            revealed = self._reveal(self.clues.take_from_area(area, self.clues_per_visit))
+        if self.log_session is not None:
+            self.log.area(self.log_session, self.turns, self.pack.area_ids[area], revealed)
+        return revealed
+
+    def enter_suspect(self, suspect):
+        # Investigar un sospechoso: revela pistas que lo mencionan, sin retirarlas.
+        revealed = None
+        if self._spend_turn():
+            revealed = self._reveal(self.clues.find_suspect(suspect, CLUES_PER_LOOKUP))
+        if self.log_session is not None:
+            self.log.suspect(self.log_session, self.turns, self.pack.suspect_ids[suspect], revealed)
+        return revealed
+
+    def enter_weapon(self, weapon):
+        # Investigar un arma: revela pistas que la mencionan, sin retirarlas.
+        revealed = None
+        if self._spend_turn():
+            revealed = self._reveal(self.clues.find_weapon(weapon, CLUES_PER_LOOKUP))
+        if self.log_session is not None:
+            self.log.weapon(self.log_session, self.turns, self.pack.weapon_ids[weapon], revealed)
+        return revealed
+
+    # ========================
+    # ACUSACION
+    # ========================
+
+    def make_accusation(self, suspect, weapon, location):
+        # Evalúa la acusación y genera la narrativa final del caso.
+        correct = (suspect == self.culprit and weapon == self.weapon and location == self.location)
+        pack = self.pack
+        secondary = sample_other(len(pack.areas), pack.area_ids[self.location], self.rng)
+        narrative = pack.narrative.format(
+            culprit=self.culprit,
+            weapon=self.weapon,
+            location=self.location,
+            secondary_area=pack.areas[secondary],
+            weather=self.rng.choice(pack.weathers)
+        )
+        if self.log_session is not None:
+            self.log.accusation(self.log_session, self.turns, suspect, weapon, location, correct)
+        return {
+            "correct": correct,
+            "culprit": self.culprit,
+            "weapon": self.weapon,
+            "location": self.location,
+            "narrative": narrative,
+        }
@@ -0,0 +1,346 @@
+import argparse
+import mmap
+import os
+import struct
+import threading
+from array import array
+from collections import deque
+
+from engine import (SUSPECTS, WEAPONS, AREAS, SUSPECT_IDS, WEAPON_IDS, AREA_IDS, MAX_TURNS,
+                    GENERATOR_VERSION, ClueEngine, generate_case)
+
+# ========================
+# REGISTRO BINARIO DE EVENTOS
+# Cada sesión (una partida) escribe eventos de ancho fijo en un registro de solo
+# añadido, repartido en segmentos "eventos-NNNNNN.log". Un segmento empieza con una
+# cabecera de 16 bytes (<8sHHI: magia, versión del formato, versión del generador de
+# casos, nº de segmento) seguida de registros de 16 bytes (<IBBHQ):
+#   sesión   uint32   id de la sesión dentro del registro (ver SESSION_BITS)
+#   acción   uint8    CASE_SEED, CASE_ID, AREA, SUSPECT, WEAPON o ACCUSE
+#   turno    uint8    turnos gastados tras la acción
+#   entidad  uint16   id del área/sospechoso/arma; en ACCUSE, s | w << 4 | a << 8
+#   arg      uint64   CASE_SEED: semilla maestra; CASE_ID: id de caso;
+#                     AREA/SUSPECT/WEAPON: ids de las pistas reveladas (id + 1 en cada
+#                     byte, 0 = fin) o NO_TURN si ya no quedaban turnos;
+#                     ACCUSE: 1 si fue correcta
+#
+# Escribir un evento solo empaqueta 16 bytes y los añade a una cola en memoria (deque,
+# segura entre hilos sin candados); un hilo aparte la vacía en disco periódicamente, así
+# que quien juega (el bucle de Tk, el servidor) nunca espera a la escritura. El lector
+# abre los segmentos con mmap y desempaqueta directamente sobre el mapa, sin copiar el
+# archivo.
+#
+# Los eventos solo guardan (semilla, id de caso): las pistas se reconstruyen con el
+# generador. Por eso cada segmento anota GENERATOR_VERSION, y los escritos con otra
+# versión (u otro formato) se descartan al leer en lugar de atribuirles pistas ajenas.
+# ========================
+
+MAGIC = b"CLUELOG\0"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<8sHHI")
+RECORD = struct.Struct("<IBBHQ")
+SEGMENT_PREFIX = "eventos-"
+SEGMENT_SUFFIX = ".log"
+
+CASE_SEED, CASE_ID, AREA, SUSPECT, WEAPON, ACCUSE = range(6)
+ACTION_NAMES = ["seed", "case", "area", "suspect", "weapon", "accuse"]
+NO_TURN = 2 ** 64 - 1
+# Los ids de sesión se reservan por bloques ligados a un segmento: nº de segmento <<
+# SESSION_BITS | contador. Cada segmento lo crea un solo escritor, así que dos escritores
+# sobre el mismo directorio nunca repiten id.
+SESSION_BITS = 12
+UNKNOWN_ENTITY = 0xF  # nombre fuera de las listas en una acusación
+
+def pack_clue_ids(clues):
+    arg = 0
+    for i, c in enumerate(clues):
+        arg |= (c.id + 1) << (8 * i)
+    return arg
+
+def unpack_clue_ids(arg):
+    ids = []
+    while arg and arg != NO_TURN:
+        ids.append((arg & 0xFF) - 1)
+        arg >>= 8
+    return ids
+
+def segment_paths(directory):
+    names = sorted(n for n in os.listdir(directory)
+                   if n.startswith(SEGMENT_PREFIX) and n.endswith(SEGMENT_SUFFIX))
+    return [os.path.join(directory, n) for n in names]
+
+def check_header(path, header):
+    # Lanza ValueError si la cabecera no es de este formato o de este generador de casos.
+    magic, version, generator, _ = HEADER.unpack_from(header)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path} no es un segmento de eventos compatible")
+    if generator != GENERATOR_VERSION:
+        raise ValueError(f"{path} se escribió con la versión {generator} del generador de casos "
+                         f"(la actual es la {GENERATOR_VERSION})")
+
+def compatible_segments(directory):
+    # (segmentos que se pueden leer, [(segmento, motivo)] de los que se descartan).
+    paths, skipped = [], []
+    for path in segment_paths(directory):
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            continue
+        try:
+            check_header(path, header)
+        except ValueError as e:
+            skipped.append((path, str(e)))
+            continue
+        paths.append(path)
+    return paths, skipped
+
+def open_segment(path):
+    # (mmap, memoryview de los registros completos) de un segmento, o None si está vacío.
+    # Lanza ValueError si el segmento no es compatible (ver check_header).
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= HEADER.size:
+            return None
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        check_header(path, mm)
+    except ValueError:
+        mm.close()
+        raise
+    # Un registro a medio escribir (por ejemplo, tras un corte) se ignora.
+    end = HEADER.size + (size - HEADER.size) // RECORD.size * RECORD.size
+    return mm, memoryview(mm)[HEADER.size:end]
+
+# ========================
+# ESCRITURA
+# ========================
+
+class EventLog:
+    def __init__(self, directory, segment_records=1 << 20, flush_interval=0.5, flush_records=4096):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_records = segment_records
+        self.flush_interval = flush_interval
+        self.flush_records = flush_records
+
+        # Cada apertura empieza un segmento nuevo; los anteriores no se vuelven a tocar.
+        # Los segmentos se crean en exclusiva (ver _open_segment), así que varios
+        # escritores sobre el mismo directorio nunca comparten ni truncan un archivo.
+        paths = segment_paths(directory)
+        self._segment_no = 0
+        if paths:
+            last = os.path.basename(paths[-1])
+            self._segment_no = int(last[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) + 1
+        self._file = None
+        self._written = 0
+        self._write_lock = threading.Lock()  # el hilo de volcado y flush() explícitos
+        self._session_lock = threading.Lock()
+        self._open_segment()
+        self._claim_sessions()
+
+        self._pending = deque()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    def record(self, session, action, turn, entity, arg):
+        pending = self._pending
+        pending.append(RECORD.pack(session, action, turn, entity, arg))
+        if len(pending) == self.flush_records:
+            self._wake.set()
+
+    # Eventos de una partida (los llama ClueEngine si tiene registro).
+
+    def _claim_sessions(self):
+        # Bloque de ids de sesión propio: el del último segmento que creó este escritor.
+        self._next_session = self._file_segment << SESSION_BITS
+        self._session_end = self._next_session + (1 << SESSION_BITS)
+
+    def start_session(self, case):
+        # Reserva un id de sesión y anota el caso; devuelve el id.
+        with self._session_lock:
+            if self._next_session == self._session_end:
+                # Bloque agotado: se crea otro segmento para reservar un bloque nuevo.
+                with self._write_lock:
+                    self._open_segment()
+                self._claim_sessions()
+            session = self._next_session
+            self._next_session += 1
+        self.record(session, CASE_SEED, 0, 0, case.master_seed)
+        self.record(session, CASE_ID, 0, 0, case.case_id)
+        return session
+
+    def action(self, session, action, turn, entity, revealed):
+        # revealed: pistas reveladas, o None si la acción no se hizo por falta de turnos.
+        self.record(session, action, turn, entity, NO_TURN if revealed is None else pack_clue_ids(revealed))
+
+    def area(self, session, turn, area_id, revealed):
+        self.action(session, AREA, turn, area_id, revealed)
+
+    def suspect(self, session, turn, suspect_id, revealed):
+        self.action(session, SUSPECT, turn, suspect_id, revealed)
+
+    def weapon(self, session, turn, weapon_id, revealed):
+        self.action(session, WEAPON, turn, weapon_id, revealed)
+
+    def accusation(self, session, turn, suspect, weapon, location, correct):
+        entity = (SUSPECT_IDS.get(suspect, UNKNOWN_ENTITY) | WEAPON_IDS.get(weapon, UNKNOWN_ENTITY) << 4
+                  | AREA_IDS.get(location, UNKNOWN_ENTITY) << 8)
+        self.record(session, ACCUSE, turn, entity, int(correct))
+
+    # Volcado a disco (hilo aparte).
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        with self._write_lock:
+            pending = self._pending
+            chunks = []
+            try:
+                for _ in range(len(pending)):
+                    chunks.append(pending.popleft())
+            except IndexError:
+                pass
+            view = memoryview(b"".join(chunks))
+            while view:
+                if self._file is None or self._written == self.segment_records:
+                    self._open_segment()
+                n = min(len(view) // RECORD.size, self.segment_records - self._written)
+                self._file.write(view[:n * RECORD.size])
+                self._written += n
+                view = view[n * RECORD.size:]
+            if self._file is not None:
+                self._file.flush()
+
+    def _open_segment(self):
+        if self._file is not None:
+            self._file.close()
+        # "xb" falla si el archivo ya existe: si otro escritor se adelantó con ese número,
+        # se prueba con el siguiente.
+        while True:
+            path = os.path.join(self.directory, f"{SEGMENT_PREFIX}{self._segment_no:06d}{SEGMENT_SUFFIX}")
+            try:
+                self._file = open(path, "xb")
+                break
+            except FileExistsError:
+                self._segment_no += 1
+        self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION, GENERATOR_VERSION, self._segment_no))
+        self._file_segment = self._segment_no
+        self._segment_no += 1
+        self._written = 0
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+# ========================
+# LECTURA Y REPETICIÓN
+# ========================
+
+class EventLogReader:
+    def __init__(self, directory):
+        # Solo los segmentos del generador actual; skipped dice cuáles se descartaron y por qué.
+        paths, self.skipped = compatible_segments(directory)
+        self.segments = [s for s in map(open_segment, paths) if s is not None]
+        self._index = None
+
+    def __len__(self):
+        return sum(len(view) // RECORD.size for _, view in self.segments)
+
+    def __iter__(self):
+        # Todos los eventos (sesión, acción, turno, entidad, arg) en orden de escritura.
+        for _, view in self.segments:
+            yield from RECORD.iter_unpack(view)
+
+    def index(self):
+        # Posiciones de los eventos de cada sesión: segmento << 32 | nº de registro.
+        if self._index is None:
+            index = {}
+            for s, (_, view) in enumerate(self.segments):
+                base = s << 32
+                for i, (session, *_) in enumerate(RECORD.iter_unpack(view)):
+                    positions = index.get(session)
+                    if positions is None:
+                        positions = index[session] = array("Q")
+                    positions.append(base | i)
+            self._index = index
+        return self._index
+
+    def sessions(self):
+        return list(self.index())
+
+    def events(self, session):
+        # Eventos de una sesión, leídos directamente del mapa de cada segmento.
+        for position in self.index().get(session, ()):
+            view = self.segments[position >> 32][1]
+            yield RECORD.unpack_from(view, (position & 0xFFFFFFFF) * RECORD.size)
+
+    def close(self):
+        for mm, view in self.segments:
+            view.release()
+            mm.close()
+        self.segments = []
+
+def replay(events, max_turns=MAX_TURNS):
+    # Vuelve a jugar una sesión con el motor y comprueba que revela las mismas pistas.
+    # Devuelve el motor en el estado final y la lista de resultados de las acusaciones.
+    # Los eventos deben venir de un segmento del generador actual (EventLogReader solo
+    # lee esos); si aun así algo no coincide, se lanza ValueError.
+    engine = None
+    master_seed = None
+    accusations = []
+    for session, action, turn, entity, arg in events:
+        if action == CASE_SEED:
+            master_seed = arg
+        elif action == CASE_ID:
+            engine = ClueEngine(max_turns=max_turns, master_seed=master_seed)
+            engine.load_case(generate_case(master_seed, arg))
+        elif action == ACCUSE:
+            names = [names[i] if i < len(names) else None
+                     for names, i in ((SUSPECTS, entity & 0xF), (WEAPONS, entity >> 4 & 0xF),
+                                      (AREAS, entity >> 8 & 0xF))]
+            accusations.append(engine.make_accusation(*names))
+        else:
+            enter, names = {AREA: (engine.enter_area, AREAS), SUSPECT: (engine.enter_suspect, SUSPECTS),
+                            WEAPON: (engine.enter_weapon, WEAPONS)}[action]
+            revealed = enter(names[entity])
+            got = NO_TURN if revealed is None else pack_clue_ids(revealed)
+            if got != arg or engine.turns != turn:
+                raise ValueError(f"la sesión {session} no coincide con el generador actual")
+    return engine, accusations
+
+def main():
+    parser = argparse.ArgumentParser(description="Consulta del registro de eventos de partidas")
+    parser.add_argument("directory")
+    parser.add_argument("--session", type=int, default=None, help="muestra y repite una sesión")
+    args = parser.parse_args()
+
+    reader = EventLogReader(args.directory)
+    for path, reason in reader.skipped:
+        print(f"Omitido: {reason}")
+    if args.session is None:
+        sessions = reader.sessions()
+        print(f"{len(reader.segments)} segmentos, {len(reader)} eventos, {len(sessions)} sesiones")
+        if sessions:
+            print(f"Ids de sesión: de {min(sessions)} a {max(sessions)}")
+        return
+    events = list(reader.events(args.session))
+    for session, action, turn, entity, arg in events:
+        detail = arg if action in (CASE_SEED, CASE_ID, ACCUSE) else unpack_clue_ids(arg)
+        print(f"  turno {turn:2}  {ACTION_NAMES[action]:>7}  entidad {entity:4}  {detail}")
+    engine, accusations = replay(events)
+    print(f"Repetición correcta: {engine.turns} turnos, {len(engine.found_clues)} pistas, "
+          f"{sum(a['correct'] for a in accusations)}/{len(accusations)} acusaciones correctas")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import tkinter as tk
+import traceback
+from array import array
+from collections import Counter, deque
+from functools import wraps
+
+import engine
+from engine import GENERATOR_VERSION
+
+# ========================
+# INSTRUMENTACIÓN OPCIONAL DEL JUEGO
+# Mide cuánto tardan las llamadas de la interfaz y del motor mientras se juega, sin
+# cambiar su código: Profiler envuelve funciones y métodos y anota cada duración en un
+# histograma logarítmico. Cada llamada solo añade la duración a un array; el array se
+# vuelca en las cubetas cada FOLD_AT muestras, así que la memoria no crece.
+#
+#   - install_tk() mide todos los callbacks de Tk (comandos de botones, bind, bind_all,
+#     after): se engancha a tkinter.CallWrapper, por donde pasan todos. Cada callback se
+#     nombra por su función (las lambdas, con su número de línea).
+#   - instrument_game() envuelve además los métodos de ClueGameGUI que reconstruyen
+#     pantallas, las acciones de ClueEngine y engine.generate_clues/generate_case.
+#   - StallWatchdog detecta bloqueos del bucle de Tk: un latido con after() marca cuándo
+#     el bucle atiende eventos y un hilo aparte, si el latido se retrasa más del umbral,
+#     toma muestras de la pila del hilo principal para saber dónde estaba atascado.
+#
+# Nada de esto se activa si no se pide (clue_night_city.py --profile). export() escribe
+# un perfil plano en JSON; "show" lo muestra y "compare" compara dos perfiles (por
+# ejemplo, de dos versiones del juego).
+# ========================
+
+PROFILE_VERSION = 1
+# Histograma: valores < 16 ns exactos; a partir de ahí 8 cubetas por potencia de 2
+# (error relativo < 12,5 %). 320 cubetas llegan a más de una hora.
+SUB_BITS = 3
+N_BUCKETS = 320
+FOLD_AT = 4096
+
+def bucket_of(ns):
+    if ns < 1 << (SUB_BITS + 1):
+        return ns
+    shift = ns.bit_length() - SUB_BITS - 1
+    return min((shift << SUB_BITS) + (ns >> shift), N_BUCKETS - 1)
+
+def bucket_bounds(index):
+    # [inferior, superior) en nanosegundos.
+    if index < 1 << (SUB_BITS + 1):
+        return index, index + 1
+    shift = (index >> SUB_BITS) - 1
+    top = (index & ((1 << SUB_BITS) - 1)) | 1 << SUB_BITS
+    return top << shift, (top + 1) << shift
+
+class Histogram:
+    __slots__ = ("counts", "calls", "total", "max", "pending", "lock")
+
+    def __init__(self):
+        self.counts = [0] * N_BUCKETS
+        self.calls = 0
+        self.total = 0
+        self.max = 0
+        self.pending = array("Q")   # duraciones aún sin volcar en las cubetas
+        self.lock = threading.Lock()  # vuelcan varios hilos (Tk, CasePool, sugerencias)
+
+    def record(self, ns):
+        pending = self.pending
+        pending.append(ns)
+        if len(pending) >= FOLD_AT:
+            self.fold()
+
+    def fold(self):
+        with self.lock:
+            self._fold()
+
+    def _fold(self):
+        # Solo se borra lo que se ha leído: otro hilo puede estar añadiendo a la vez.
+        samples = self.pending.tolist()
+        if not samples:
+            return
+        del self.pending[:len(samples)]
+        counts = self.counts
+        for ns in samples:
+            counts[bucket_of(ns)] += 1
+        self.calls += len(samples)
+        self.total += sum(samples)
+        self.max = max(self.max, max(samples))
+
+    def percentile(self, q):
+        # Punto medio de la cubeta que contiene el percentil q (0-100), en ns.
+        if not self.calls:
+            return 0
+        rank = q / 100 * self.calls
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                lo, hi = bucket_bounds(index)
+                return min((lo + hi) / 2, self.max)
+        return self.max
+
+    def summary(self):
+        with self.lock:
+            self._fold()
+            return {
+                "calls": self.calls,
+                "total_ms": self.total / 1e6,
+                "mean_us": self.total / self.calls / 1e3 if self.calls else 0.0,
+                "p50_us": self.percentile(50) / 1e3,
+                "p90_us": self.percentile(90) / 1e3,
+                "p99_us": self.percentile(99) / 1e3,
+                "max_us": self.max / 1e3,
+                "buckets": [[i, n] for i, n in enumerate(self.counts) if n],
+            }
+
+# ========================
+# MEDICIÓN DE LLAMADAS
+# ========================
+
+def callback_name(func):
+    # Nombre legible de un callback; las lambdas y funciones locales llevan su línea.
+    target = getattr(func, "__func__", func)
+    name = getattr(target, "__qualname__", None) or repr(target)
+    code = getattr(target, "__code__", None)
+    if code is not None and "<locals>" in name:
+        name = f"{name.replace('.<locals>', '')}:{code.co_firstlineno}"
+    return name
+
+class Profiler:
+    def __init__(self):
+        self.timers = {}
+        self.started = time.perf_counter()
+        self.stalls = []
+        self._patched = []   # (objeto, atributo, valor original) para uninstall()
+
+    def timer(self, name):
+        histogram = self.timers.get(name)
+        if histogram is None:
+            histogram = self.timers[name] = Histogram()
+        return histogram
+
+    def wrap(self, name, func):
+        histogram = self.timer(name)
+        pending = histogram.pending
+        append = pending.append
+        clock = time.perf_counter_ns
+
+        @wraps(func)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                append(clock() - start)
+                if len(pending) >= FOLD_AT:
+                    histogram.fold()
+        return timed
+
+    def patch(self, owner, attr, name):
+        # Sustituye owner.attr por su versión medida (en una instancia, solo en esa).
+        original = getattr(owner, attr)
+        self._patched.append((owner, attr, owner.__dict__.get(attr)))
+        setattr(owner, attr, self.wrap(name, original))
+
+    def install_tk(self):
+        # Mide todos los callbacks que Tk entrega a Python.
+        names = {}
+        timer = self.timer
+        clock = time.perf_counter_ns
+        original = tk.CallWrapper.__call__
+
+        def timed_call(wrapper, *args):
+            func = wrapper.func
+            key = getattr(func, "__func__", func)
+            name = names.get(key)
+            if name is None:
+                name = names[key] = "tk:" + callback_name(func)
+            start = clock()
+            try:
+                return original(wrapper, *args)
+            finally:
+                timer(name).record(clock() - start)
+
+        self._patched.append((tk.CallWrapper, "__call__", original))
+        tk.CallWrapper.__call__ = timed_call
+
+    def uninstall(self):
+        for owner, attr, original in reversed(self._patched):
+            if original is None:
+                delattr(owner, attr)
+            else:
+                setattr(owner, attr, original)
+        self._patched = []
+
+    # ========================
+    # PERFIL PLANO
+    # ========================
+
+    def to_dict(self):
+        return {
+            "version": PROFILE_VERSION,
+            "generator_version": GENERATOR_VERSION,
+            "python": sys.version.split()[0],
+            "wall_s": time.perf_counter() - self.started,
+            "timers": {name: summary for name, summary in
+                       ((name, h.summary()) for name, h in sorted(self.timers.items())) if summary["calls"]},
+            "stalls": self.stalls,
+        }
+
+    def export(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=1, ensure_ascii=False)
+        os.replace(tmp, path)
+
+# Métodos que se miden con instrument_game().
+GUI_METHODS = ("show_frame", "update_acusacion_pistas", "clear_investigation_buttons",
+               "show_selection_panel", "update_status", "restart_game", "initialize_game")
+ENGINE_METHODS = ("new_game", "load_case", "enter_area", "enter_suspect", "enter_weapon",
+                  "make_accusation")
+ENGINE_FUNCTIONS = ("generate_clues", "generate_case")
+
+def instrument_game(app, profiler):
+    # Envuelve los callbacks de Tk, los métodos de la interfaz y los del motor de app.
+    profiler.install_tk()
+    for name in GUI_METHODS:
+        profiler.patch(app, name, f"gui.{name}")
+    for name in ENGINE_METHODS:
+        profiler.patch(app.engine, name, f"engine.{name}")
+    # generate_case busca generate_clues en el módulo en cada llamada, pero CasePool y la
+    # interfaz guardan su propia referencia a generate_case: se envuelven también, con el
+    # mismo nombre, para que la medida incluya la generación en segundo plano y la del catálogo.
+    for name in ENGINE_FUNCTIONS:
+        profiler.patch(engine, name, f"engine.{name}")
+    if app.engine.pool is not None:
+        profiler.patch(app.engine.pool, "_generate", "engine.generate_case")
+    gui_module = sys.modules[type(app).__module__]
+    if hasattr(gui_module, "generate_case"):
+        profiler.patch(gui_module, "generate_case", "engine.generate_case")
+
+# ========================
+# VIGILANTE DE BLOQUEOS DEL BUCLE DE TK
+# ========================
+
+class StallWatchdog:
+    def __init__(self, root, profiler, threshold=0.1, interval=0.02, max_depth=30):
+        # threshold: retraso del latido (s) a partir del cual se considera un bloqueo.
+        self.root = root
+        self.profiler = profiler
+        self.threshold = threshold
+        self.interval = interval
+        self.max_depth = max_depth
+        self.lag = profiler.timer("tk.loop_lag")
+        self.last_beat = time.perf_counter()
+        self._samples = deque()
+        self._main_id = threading.main_thread().ident
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+
+    def start(self):
+        self.last_beat = time.perf_counter()
+        self.root.after(int(self.interval * 1000), self._beat)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _beat(self):
+        # Hilo principal: el retraso respecto al intervalo es lo que el bucle estuvo ocupado.
+        now = time.perf_counter()
+        late = now - self.last_beat - self.interval
+        self.lag.record(max(0, int(late * 1e9)))
+        if late > self.threshold:
+            self._close_stall(self.last_beat, late)
+        self.last_beat = now
+        if not self._stopped.is_set():
+            self.root.after(int(self.interval * 1000), self._beat)
+
+    def _close_stall(self, start, duration):
+        samples = Counter()
+        try:
+            while True:
+                samples[self._samples.popleft()] += 1
+        except IndexError:
+            pass
+        self.profiler.stalls.append({
+            "at_s": start - self.profiler.started,
+            "duration_ms": duration * 1000,
+            "stacks": [[n, list(stack)] for stack, n in samples.most_common()],
+        })
+
+    def _watch(self):
+        # Hilo aparte: mientras el latido vaya retrasado, muestrea la pila del hilo principal.
+        while not self._stopped.wait(self.interval):
+            if time.perf_counter() - self.last_beat - self.interval <= self.threshold:
+                continue
+            frame = sys._current_frames().get(self._main_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame, limit=self.max_depth)
+            self._samples.append(tuple(f"{os.path.basename(f.filename)}:{f.lineno} {f.name}"
+                                       for f in stack))
+            del frame
+
+# ========================
+# LECTURA Y COMPARACIÓN DE PERFILES
+# ========================
+
+def load_profile(path):
+    with open(path, encoding="utf-8") as f:
+        profile = json.load(f)
+    if profile.get("version") != PROFILE_VERSION:
+        raise ValueError(f"{path} no es un perfil compatible")
+    return profile
+
+def show(profile, top_stalls=5):
+    print(f"{'llamada':<52} {'nº':>7} {'total ms':>10} {'p50 µs':>9} {'p99 µs':>9} {'máx µs':>10}")
+    timers = sorted(profile["timers"].items(), key=lambda item: -item[1]["total_ms"])
+    for name, t in timers:
+        print(f"{name:<52} {t['calls']:>7} {t['total_ms']:>10.1f} {t['p50_us']:>9.1f} "
+              f"{t['p99_us']:>9.1f} {t['max_us']:>10.1f}")
+    stalls = profile["stalls"]
+    print(f"\nBloqueos del bucle: {len(stalls)}")
+    for stall in sorted(stalls, key=lambda s: -s["duration_ms"])[:top_stalls]:
+        print(f"  {stall['duration_ms']:.0f} ms a los {stall['at_s']:.1f} s")
+        if stall["stacks"]:
+            n, frames = stall["stacks"][0]
+            for frame in frames[-6:]:
+                print(f"      {frame}")
+
+def compare(base, new):
+    # Variación de p50/p99 de las llamadas presentes en ambos perfiles.
+    print(f"{'llamada':<52} {'p50 base':>9} {'p50 nuevo':>9} {'Δ':>7}  {'p99 base':>9} {'p99 nuevo':>9} {'Δ':>7}")
+    for name in sorted(set(base["timers"]) & set(new["timers"])):
+        b, n = base["timers"][name], new["timers"][name]
+        d50 = n["p50_us"] / b["p50_us"] - 1 if b["p50_us"] else 0.0
+        d99 = n["p99_us"] / b["p99_us"] - 1 if b["p99_us"] else 0.0
+        print(f"{name:<52} {b['p50_us']:>9.1f} {n['p50_us']:>9.1f} {d50:>+7.0%}  "
+              f"{b['p99_us']:>9.1f} {n['p99_us']:>9.1f} {d99:>+7.0%}")
+    for name in sorted(set(base["timers"]) ^ set(new["timers"])):
+        print(f"{name:<52} solo en el perfil {'base' if name in base['timers'] else 'nuevo'}")
+    print(f"\nBloqueos: {len(base['stalls'])} -> {len(new['stalls'])}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Consulta de perfiles del juego (clue_night_city.py --profile)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    show_cmd = commands.add_parser("show", help="muestra un perfil")
+    show_cmd.add_argument("profile")
+    compare_cmd = commands.add_parser("compare", help="compara dos perfiles")
+    compare_cmd.add_argument("base")
+    compare_cmd.add_argument("new")
+    args = parser.parse_args()
+
+    if args.command == "show":
+        show(load_profile(args.profile))
+    else:
+        compare(load_profile(args.base), load_profile(args.new))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from engine import SUSPECTS, WEAPONS, AREAS
+
+# ========================
+# GENERADOR DE CARGA PARA server.py
+# Abre varias conexiones a un servidor local; cada una crea su sesión y juega partidas
+# completas (acciones al azar hasta agotar los turnos, acusación y reinicio) durante el
+# tiempo indicado. Mide la latencia de cada petición (enviar la línea y recibir la
+# respuesta) y al final informa p50/p99 y acciones por segundo.
+# ========================
+
+ACTIONS = ([("area", a) for a in AREAS] + [("suspect", s) for s in SUSPECTS]
+           + [("weapon", w) for w in WEAPONS])
+
+class Client:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+        self.latencies = []
+
+    async def call(self, **request):
+        self.next_id += 1
+        request["id"] = self.next_id
+        start = time.perf_counter()
+        self.writer.write(json.dumps(request).encode() + b"\n")
+        line = await self.reader.readline()
+        self.latencies.append(time.perf_counter() - start)
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise RuntimeError(f"el servidor respondió con error: {response.get('error')}")
+        return response
+
+async def play(host, port, deadline, rng):
+    reader, writer = await asyncio.open_connection(host, port)
+    client = Client(reader, writer)
+    session = (await client.call(op="new"))["session"]
+    games = 0
+    while time.perf_counter() < deadline:
+        while True:
+            kind, name = rng.choice(ACTIONS)
+            if (await client.call(op=kind, session=session, name=name))["out_of_turns"]:
+                break
+        await client.call(op="accuse", session=session, suspect=rng.choice(SUSPECTS),
+                          weapon=rng.choice(WEAPONS), location=rng.choice(AREAS))
+        await client.call(op="restart", session=session)
+        games += 1
+    await client.call(op="close", session=session)
+    writer.close()
+    return client.latencies, games
+
+async def run(host, port, connections, duration, seed):
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    deadline = start + duration
+    results = await asyncio.gather(*(play(host, port, deadline, random.Random(rng.random()))
+                                     for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(l for lat, _ in results for l in lat)
+    games = sum(g for _, g in results)
+    return latencies, games, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga para el servidor de partidas")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("-c", "--connections", type=int, default=100, help="conexiones simultáneas")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="segundos de prueba")
+    parser.add_argument("-s", "--seed", type=int, default=None, help="semilla de las acciones")
+    args = parser.parse_args()
+
+    latencies, games, elapsed = asyncio.run(run(args.host, args.port, args.connections,
+                                                args.duration, args.seed))
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(f"Conexiones:        {args.connections}")
+    print(f"Peticiones:        {len(latencies)} ({games} partidas completas)")
+    print(f"Rendimiento:       {len(latencies) / elapsed:,.0f} peticiones/s")
+    print(f"Latencia p50:      {percentiles[49] * 1000:.2f} ms")
+    print(f"Latencia p99:      {percentiles[98] * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
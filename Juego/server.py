@@ -0,0 +1,271 @@
+import argparse
+import asyncio
+import json
+import secrets
+import shelve
+import struct
+import traceback
+from array import array
+from collections import OrderedDict
+
+from engine import (AREAS, AREA_IDS, SUSPECT_IDS, WEAPON_IDS, MAX_TURNS, GENERATOR_VERSION, ClueEngine,
+                    generate_case, new_master_seed)
+from eventlog import EventLog
+
+# ========================
+# SERVIDOR DE PARTIDAS (JSON POR LÍNEAS SOBRE asyncio)
+# Expone las mismas reglas que la interfaz (investigar áreas, sospechosos y armas,
+# acusar y reiniciar) a clientes locales. Cada petición es una línea JSON y cada
+# respuesta también:
+#   {"id": 1, "op": "new"}                                -> {"id": 1, "ok": true, "session": "...", ...}
+#   {"id": 2, "op": "area", "session": "...", "name": "Penthouse"}
+#   {"id": 3, "op": "suspect" | "weapon", "session": "...", "name": "..."}
+#   {"id": 4, "op": "accuse", "session": "...", "suspect": "...", "weapon": "...", "location": "..."}
+#   {"id": 5, "op": "restart" | "state" | "close", "session": "..."}
+# Los errores se responden con {"id": ..., "ok": false, "error": "..."}.
+#
+# Una sesión guarda solo el caso (el mazo en su forma archivada) y el progreso compacto
+# del motor (ClueEngine.progress); un único ClueEngine se reutiliza para atender cada
+# acción. Las sesiones viven en un almacén LRU acotado: al superar la capacidad, las
+# menos usadas se escriben en un archivo shelve y se recuperan al volver a usarse.
+# ========================
+
+# Registro de una sesión en el archivo: versión del generador de casos, semilla, id de
+# caso, sesión en el registro de eventos, turnos, pistas retiradas por área y nº de pistas
+# encontradas, seguido de sus ids (un byte cada uno). El caso se regenera al recuperarla,
+# así que una sesión guardada con otra versión del generador ya no se puede continuar.
+SNAPSHOT = struct.Struct(f"<HQQIB{len(AREAS)}sB")
+
+class Session:
+    __slots__ = ("case", "log_id", "turns", "taken", "found")
+
+    def __init__(self, case, log_id=0, turns=0, taken=None, found=None):
+        self.case = case
+        self.log_id = log_id
+        self.turns = turns
+        self.taken = bytes(len(AREAS)) if taken is None else taken
+        self.found = array("B") if found is None else found
+
+    def to_bytes(self):
+        case = self.case
+        return (SNAPSHOT.pack(GENERATOR_VERSION, case.master_seed, case.case_id, self.log_id, self.turns,
+                              self.taken, len(self.found))
+                + self.found.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data):
+        # None si la sesión se guardó con otra versión del generador (o en otro formato).
+        if len(data) < SNAPSHOT.size:
+            return None
+        generator, master_seed, case_id, log_id, turns, taken, n = SNAPSHOT.unpack_from(data)
+        if generator != GENERATOR_VERSION or len(data) != SNAPSHOT.size + n:
+            return None
+        found = array("B", data[SNAPSHOT.size:SNAPSHOT.size + n])
+        return cls(generate_case(master_seed, case_id), log_id, turns, taken, found)
+
+class SessionStore:
+    def __init__(self, capacity, snapshot_path):
+        self.capacity = capacity
+        self.sessions = OrderedDict()
+        self.snapshots = shelve.open(snapshot_path)
+        self.evicted = 0
+        self.restored = 0
+        self.discarded = 0
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def get(self, session_id):
+        # Sesión activa, recuperándola del archivo si se había desalojado; None si no existe.
+        session = self.sessions.get(session_id)
+        if session is not None:
+            self.sessions.move_to_end(session_id)
+            return session
+        data = self.snapshots.get(session_id)
+        if data is None:
+            return None
+        del self.snapshots[session_id]
+        session = Session.from_bytes(data)
+        if session is None:
+            self.discarded += 1
+            return None
+        self.restored += 1
+        self.put(session_id, session)
+        return session
+
+    def put(self, session_id, session):
+        self.sessions[session_id] = session
+        self.sessions.move_to_end(session_id)
+        while len(self.sessions) > self.capacity:
+            old_id, old = self.sessions.popitem(last=False)
+            self.snapshots[old_id] = old.to_bytes()
+            self.evicted += 1
+
+    def remove(self, session_id):
+        if self.sessions.pop(session_id, None) is None:
+            self.snapshots.pop(session_id, None)
+
+    def close(self):
+        # Guarda todas las sesiones activas para poder continuarlas en otro arranque.
+        for session_id, session in self.sessions.items():
+            self.snapshots[session_id] = session.to_bytes()
+        self.sessions.clear()
+        self.snapshots.close()
+
+# ========================
+# LÓGICA DEL SERVIDOR
+# ========================
+
+class GameServer:
+    def __init__(self, store, master_seed=None, max_turns=MAX_TURNS, log=None):
+        # log: registro de eventos opcional (eventlog.EventLog); cada caso es una sesión.
+        self.store = store
+        self.master_seed = new_master_seed() if master_seed is None else master_seed
+        self.max_turns = max_turns
+        self.next_case_id = 0
+        self.log = log
+        self.engine = ClueEngine(max_turns=max_turns, master_seed=self.master_seed)
+        self.engine.log = log
+        self.handlers = {
+            "area": lambda s, req: self.investigate(s, self.engine.enter_area, AREA_IDS, req),
+            "suspect": lambda s, req: self.investigate(s, self.engine.enter_suspect, SUSPECT_IDS, req),
+            "weapon": lambda s, req: self.investigate(s, self.engine.enter_weapon, WEAPON_IDS, req),
+            "accuse": self.accuse,
+            "restart": self.restart,
+            "state": self.state,
+        }
+
+    def new_case(self):
+        case = generate_case(self.master_seed, self.next_case_id)
+        self.next_case_id += 1
+        return Session(case, self.log.start_session(case) if self.log is not None else 0)
+
+    def handle(self, request):
+        # Atiende una petición ya decodificada y devuelve el diccionario de respuesta.
+        op = request.get("op")
+        if op == "new":
+            session_id = secrets.token_hex(8)
+            self.store.put(session_id, self.new_case())
+            return {"ok": True, "session": session_id, "max_turns": self.max_turns}
+        handler = self.handlers.get(op)
+        if handler is None and op != "close":
+            return {"ok": False, "error": f"operación desconocida: {op!r}"}
+        session_id = request.get("session")
+        session = self.store.get(session_id) if isinstance(session_id, str) else None
+        if session is None:
+            return {"ok": False, "error": f"sesión desconocida: {session_id!r}"}
+        if op == "close":
+            self.store.remove(session_id)
+            return {"ok": True}
+        return handler(session, request)
+
+    def _load(self, session):
+        self.engine.resume(session.case, session.turns, session.taken, session.found, session.log_id)
+
+    def _save(self, session):
+        session.turns, session.taken, session.found = self.engine.progress()
+        # El mazo vuelve a su forma archivada para que la sesión ocupe poco.
+        session.case.clues.release()
+
+    def investigate(self, session, action, ids, request):
+        # Se valida el nombre antes de tocar el motor: un nombre erróneo no gasta turno.
+        name = request.get("name")
+        if not isinstance(name, str) or name not in ids:
+            return {"ok": False, "error": f"nombre desconocido: {name!r}"}
+        self._load(session)
+        revealed = action(name)
+        self._save(session)
+        if revealed is None:
+            return {"ok": True, "out_of_turns": True, "turns": session.turns, "clues": []}
+        return {"ok": True, "out_of_turns": False, "turns": session.turns,
+                "clues": [{"id": c.id, "text": c.text} for c in revealed]}
+
+    def accuse(self, session, request):
+        # Como en investigate: los tres nombres se validan antes de tocar el motor.
+        for field, ids in (("suspect", SUSPECT_IDS), ("weapon", WEAPON_IDS), ("location", AREA_IDS)):
+            name = request.get(field)
+            if not isinstance(name, str) or name not in ids:
+                return {"ok": False, "error": f"{field}: nombre desconocido: {name!r}"}
+        self._load(session)
+        result = self.engine.make_accusation(request.get("suspect"), request.get("weapon"),
+                                             request.get("location"))
+        session.case.clues.release()
+        result["ok"] = True
+        return result
+
+    def restart(self, session, request):
+        fresh = self.new_case()
+        session.case, session.log_id = fresh.case, fresh.log_id
+        session.turns, session.taken, session.found = 0, fresh.taken, fresh.found
+        return {"ok": True, "turns": 0}
+
+    def state(self, session, request):
+        self._load(session)
+        clues = [c.text for c in self.engine.found_clues]
+        session.case.clues.release()
+        return {"ok": True, "turns": session.turns, "max_turns": self.max_turns, "clues": clues}
+
+    # ========================
+    # CONEXIONES
+    # ========================
+
+    async def serve_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("se esperaba un objeto JSON")
+                except ValueError as e:
+                    response = {"ok": False, "error": f"petición inválida: {e}"}
+                else:
+                    try:
+                        response = self.handle(request)
+                    except Exception as e:
+                        # Un fallo al atender una petición no debe cerrar la conexión.
+                        traceback.print_exc()
+                        response = {"ok": False, "error": f"error interno: {e}"}
+                    if "id" in request:
+                        response["id"] = request["id"]
+                writer.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+async def run_server(host, port, capacity, snapshot_path, master_seed, events_dir=None):
+    store = SessionStore(capacity, snapshot_path)
+    log = EventLog(events_dir) if events_dir else None
+    game = GameServer(store, master_seed, log=log)
+    server = await asyncio.start_server(game.serve_client, host, port)
+    print(f"Servidor escuchando en {host}:{port} (semilla {game.master_seed}, "
+          f"hasta {capacity} sesiones en memoria)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        store.close()
+        if log is not None:
+            log.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de partidas de Clue: Night City Protocol")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--capacity", type=int, default=50000, help="sesiones en memoria")
+    parser.add_argument("--snapshot", default="sesiones.db", help="archivo de sesiones desalojadas")
+    parser.add_argument("-s", "--seed", type=int, default=None, help="semilla maestra")
+    parser.add_argument("--events", default=None, help="directorio del registro de eventos")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run_server(args.host, args.port, args.capacity, args.snapshot, args.seed,
+                               args.events))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
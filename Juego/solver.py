@@ -0,0 +1,180 @@
+from engine import (SUSPECTS, WEAPONS, AREAS, DECOY_CLUES, PHYSICAL, ACCESS, SOCIAL, ITEM,
+                    SUSPECT_KINDS, CLUE_KINDS)
+
+WEAPON_KINDS = (PHYSICAL, ITEM)
+
+# ========================
+# DEDUCCIÓN BAYESIANA INCREMENTAL
+# Mantiene la probabilidad de cada hipótesis (sospechoso, arma, lugar) según las pistas
+# reveladas, usando el modelo con el que generate_clues crea los casos:
+#   - Las pistas verdaderas de arma (física y objeto) están en el lugar del crimen y
+#     nombran el arma real; hay exactamente una de cada tipo.
+#   - Las verdaderas de sospechoso (acceso y social) nombran al culpable y están juntas
+#     en una misma área al azar distinta del lugar; también una de cada tipo.
+#   - Las falsas caen en un área uniforme y nombran cualquier entidad menos la real.
+#
+# Con ese modelo la probabilidad conjunta se factoriza como
+#     P(s, w, a)  ∝  S[s][a] · W[w][a]
+# así que basta guardar dos tablas (sospechoso × área y arma × área) en lugar de las
+# S·W·A hipótesis. Cada pista solo modifica la fila de la entidad que nombra: O(A) por
+# pista, sin recalcular nada desde cero, y el tamaño crece con S+W, no con S·W·A.
+# ========================
+
+class DeductionSolver:
+    def __init__(self, n_suspects=len(SUSPECTS), n_weapons=len(WEAPONS), n_areas=len(AREAS),
+                 decoy_clues=DECOY_CLUES):
+        self.n_areas = n_areas
+        self.suspect_rows = [[1.0] * n_areas for _ in range(n_suspects)]
+        self.weapon_rows = [[1.0] * n_areas for _ in range(n_weapons)]
+        # Sumas por columna (área) de cada tabla y número de celdas aún posibles.
+        self.suspect_cols = [float(n_suspects)] * n_areas
+        self.weapon_cols = [float(n_weapons)] * n_areas
+        self.suspect_alive = [n_suspects] * n_areas
+        self.weapon_alive = [n_weapons] * n_areas
+
+        # Verosimilitud relativa de que una pista sea falsa (frente a verdadera): una falsa
+        # de un tipo concreto aparece DECOY_CLUES/4 veces de media, en un área entre A y
+        # nombrando una entidad entre las otras n-1.
+        decoys_per_kind = decoy_clues / len(CLUE_KINDS)
+        self.weapon_decoy = decoys_per_kind / (n_areas * max(n_weapons - 1, 1))
+        self.suspect_decoy = decoys_per_kind / (n_areas * max(n_suspects - 1, 1))
+
+        self.seen = set()
+        # Primera pista vista de cada (tipo, entidad) y área de la primera pista de
+        # sospechoso de cada entidad, para detectar contradicciones con el modelo.
+        self.seen_kind_entity = set()
+        self.suspect_area = {}
+
+    def copy(self):
+        # Copia independiente, para explorar qué pasaría con más pistas sin tocar esta.
+        other = object.__new__(DeductionSolver)
+        other.__dict__.update(self.__dict__)
+        other.suspect_rows = [r[:] for r in self.suspect_rows]
+        other.weapon_rows = [r[:] for r in self.weapon_rows]
+        other.suspect_cols = self.suspect_cols[:]
+        other.weapon_cols = self.weapon_cols[:]
+        other.suspect_alive = self.suspect_alive[:]
+        other.weapon_alive = self.weapon_alive[:]
+        other.seen = set(self.seen)
+        other.seen_kind_entity = set(self.seen_kind_entity)
+        other.suspect_area = dict(self.suspect_area)
+        return other
+
+    # ========================
+    # ACTUALIZACIÓN
+    # ========================
+
+    def observe(self, clue):
+        # Incorpora una pista revelada. Las repetidas (mismo id) no aportan nada nuevo.
+        if clue.id in self.seen:
+            return False
+        self.seen.add(clue.id)
+        kind, area, entity = clue.kind, clue.area, clue.entity
+        repeated = (kind, entity) in self.seen_kind_entity
+        self.seen_kind_entity.add((kind, entity))
+
+        if kind in SUSPECT_KINDS:
+            rows, cols, alive = self.suspect_rows, self.suspect_cols, self.suspect_alive
+            previous_area = self.suspect_area.setdefault(entity, area)
+            if repeated or previous_area != area:
+                # Solo hay una verdadera de cada tipo y ambas comparten área: si esta
+                # entidad fuera el culpable, alguna de sus pistas sería una falsa que
+                # nombra al culpable, lo que el modelo no permite.
+                factors = [0.0] * self.n_areas
+            elif (ACCESS + SOCIAL - kind, entity) in self.seen_kind_entity:
+                # La otra pista de sospechoso ya fijó el área; esta confirma la misma.
+                factors = [1.0 / self.suspect_decoy] * self.n_areas
+            else:
+                factors = [1.0 / ((self.n_areas - 1) * self.suspect_decoy)] * self.n_areas
+                factors[area] = 0.0
+        else:
+            rows, cols, alive = self.weapon_rows, self.weapon_cols, self.weapon_alive
+            factors = [0.0] * self.n_areas
+            if not repeated:
+                factors[area] = 1.0 / self.weapon_decoy
+
+        self._scale_row(rows[entity], factors, cols, alive)
+        return True
+
+    def observe_lookup(self, is_suspect, entity, revealed):
+        # Resultado de investigar un sospechoso o un arma. Si no aparece ninguna pista y
+        # nunca se vio una que lo nombre, no puede ser el real: sus dos pistas verdaderas
+        # o siguen en el mazo (y la búsqueda las habría encontrado) o ya se revelaron.
+        for clue in revealed:
+            self.observe(clue)
+        if revealed:
+            return
+        kinds = SUSPECT_KINDS if is_suspect else WEAPON_KINDS
+        if any((kind, entity) in self.seen_kind_entity for kind in kinds):
+            return
+        if is_suspect:
+            self._scale_row(self.suspect_rows[entity], [0.0] * self.n_areas,
+                            self.suspect_cols, self.suspect_alive)
+        else:
+            self._scale_row(self.weapon_rows[entity], [0.0] * self.n_areas,
+                            self.weapon_cols, self.weapon_alive)
+
+    def _scale_row(self, row, factors, cols, alive):
+        for a, factor in enumerate(factors):
+            old = row[a]
+            if old == 0.0 or factor == 1.0:
+                continue
+            new = old * factor
+            row[a] = new
+            cols[a] += new - old
+            if new == 0.0:
+                alive[a] -= 1
+                if alive[a] == 0:
+                    # Evita que queden restos de redondeo en una columna vacía.
+                    cols[a] = 0.0
+        if max(row) > 1e200:
+            self._rescale()
+
+    def _rescale(self):
+        # Las probabilidades solo importan en proporción; se reescala si crecen demasiado.
+        for rows, cols in ((self.suspect_rows, self.suspect_cols), (self.weapon_rows, self.weapon_cols)):
+            top = max(max(r) for r in rows) or 1.0
+            for r in rows:
+                for a in range(self.n_areas):
+                    r[a] /= top
+            for a in range(self.n_areas):
+                cols[a] = sum(r[a] for r in rows)
+
+    # ========================
+    # CONSULTAS
+    # ========================
+
+    def candidates(self):
+        # Número de hipótesis (s, w, a) que siguen siendo posibles.
+        return sum(s * w for s, w in zip(self.suspect_alive, self.weapon_alive))
+
+    def _total(self):
+        return sum(s * w for s, w in zip(self.suspect_cols, self.weapon_cols))
+
+    def probability(self, suspect, weapon, area):
+        total = self._total()
+        if total == 0.0:
+            return 0.0
+        return self.suspect_rows[suspect][area] * self.weapon_rows[weapon][area] / total
+
+    def marginals(self):
+        # Probabilidad de cada sospechoso, arma y área por separado.
+        total = self._total() or 1.0
+        suspects = [sum(r[a] * self.weapon_cols[a] for a in range(self.n_areas)) / total
+                    for r in self.suspect_rows]
+        weapons = [sum(r[a] * self.suspect_cols[a] for a in range(self.n_areas)) / total
+                   for r in self.weapon_rows]
+        areas = [s * w / total for s, w in zip(self.suspect_cols, self.weapon_cols)]
+        return suspects, weapons, areas
+
+    def best_guess(self):
+        # Hipótesis más probable y su probabilidad: ((sospechoso, arma, área), p).
+        best, best_value = (0, 0, 0), -1.0
+        for a in range(self.n_areas):
+            s = max(range(len(self.suspect_rows)), key=lambda i: self.suspect_rows[i][a])
+            w = max(range(len(self.weapon_rows)), key=lambda i: self.weapon_rows[i][a])
+            value = self.suspect_rows[s][a] * self.weapon_rows[w][a]
+            if value > best_value:
+                best, best_value = (s, w, a), value
+        total = self._total()
+        return best, (best_value / total if total else 0.0)
@@ -0,0 +1,160 @@
+from collections import Counter
+
+from engine import SUSPECTS, WEAPONS, AREAS, SUSPECT_IDS, WEAPON_IDS, AREA_IDS, DECOY_CLUES
+from solver import DeductionSolver
+
+# ========================
+# ESTRATEGIAS DE JUGADOR
+# Cada estrategia es una clase pequeña con la misma interfaz:
+#   start(engine)                 al empezar una partida
+#   next_action()                 ("area"|"suspect"|"weapon", nombre), o None para acusar ya
+#   observe(kind, name, revealed) resultado de la acción elegida
+#   accusation()                  (sospechoso, arma, lugar)
+# play_game las hace jugar con ClueEngine. Las que necesitan azar usan engine.rng, así que
+# cada caso se juega igual en cualquier proceso.
+# ========================
+
+def most_mentioned(names, ids, rng):
+    # Devuelve el nombre con más menciones (o uno al azar si no hay ninguna).
+    counts = Counter(i for i in ids if i is not None)
+    if not counts:
+        return rng.choice(names)
+    return names[counts.most_common(1)[0][0]]
+
+ACTIONS = ([("area", a) for a in AREAS] + [("suspect", s) for s in SUSPECTS]
+           + [("weapon", w) for w in WEAPONS])
+
+class Strategy:
+    name = None
+
+    def __init__(self, decoys=DECOY_CLUES):
+        self.decoys = decoys
+
+    def start(self, engine):
+        self.engine = engine
+        self.rng = engine.rng
+
+    def next_action(self):
+        raise NotImplementedError
+
+    def observe(self, kind, name, revealed):
+        pass
+
+    def accusation(self):
+        # Lo más mencionado en las pistas encontradas; el lugar es el área donde más se
+        # menciona el arma elegida (como el jugador guionizado de batch.py).
+        found = self.engine.found_clues
+        suspect = most_mentioned(SUSPECTS, [c.suspect for c in found], self.rng)
+        weapon = most_mentioned(WEAPONS, [c.weapon for c in found], self.rng)
+        weapon_id = WEAPON_IDS[weapon]
+        location = most_mentioned(AREAS, [c.area for c in found if c.weapon == weapon_id], self.rng)
+        return suspect, weapon, location
+
+class RandomStrategy(Strategy):
+    # Cualquier acción al azar en cada turno.
+    name = "random"
+
+    def next_action(self):
+        return self.rng.choice(ACTIONS)
+
+class AreaGreedyStrategy(Strategy):
+    # Solo visita áreas: la menos visitada entre las que aún no se vaciaron.
+    name = "greedy_area"
+
+    def start(self, engine):
+        super().start(engine)
+        self.visits = [0] * len(AREAS)
+        self.empty = [False] * len(AREAS)
+
+    def next_action(self):
+        options = [a for a in range(len(AREAS)) if not self.empty[a]] or range(len(AREAS))
+        return "area", AREAS[min(options, key=self.visits.__getitem__)]
+
+    def observe(self, kind, name, revealed):
+        a = AREA_IDS[name]
+        self.visits[a] += 1
+        if len(revealed) < self.engine.clues_per_visit:
+            self.empty[a] = True
+
+class SuspectFirstStrategy(Strategy):
+    # Investiga todos los sospechosos, luego todas las armas y después recorre las áreas.
+    name = "suspect_first"
+
+    def start(self, engine):
+        super().start(engine)
+        self.plan = [("suspect", s) for s in SUSPECTS] + [("weapon", w) for w in WEAPONS]
+        self.step = 0
+
+    def next_action(self):
+        step = self.step
+        self.step += 1
+        if step < len(self.plan):
+            return self.plan[step]
+        return "area", AREAS[(step - len(self.plan)) % len(AREAS)]
+
+def detective_action(solver, looked_up, visited):
+    # Siguiente acción del detective guiado por la deducción: ("suspect"|"weapon"|"area", id).
+    # Investiga el sospechoso o arma más probable aún no investigado y, cuando ya no
+    # quedan, las áreas más probables sin visitar.
+    suspects, weapons, areas = solver.marginals()
+    options = [(p, "suspect", i) for i, p in enumerate(suspects) if ("suspect", i) not in looked_up]
+    options += [(p, "weapon", i) for i, p in enumerate(weapons) if ("weapon", i) not in looked_up]
+    if options:
+        _, kind, i = max(options)
+        return kind, i
+    unvisited = [(p, a) for a, p in enumerate(areas) if a not in visited]
+    if unvisited:
+        return "area", max(unvisited)[1]
+    return "area", max(range(len(areas)), key=areas.__getitem__)
+
+class SolverStrategy(Strategy):
+    # Elige con detective_action y acusa la hipótesis más probable de DeductionSolver.
+    # Con certainty, acusa en cuanto esa hipótesis alcanza esa probabilidad.
+    name = "solver"
+
+    def __init__(self, decoys=DECOY_CLUES, certainty=None):
+        super().__init__(decoys)
+        self.certainty = certainty
+
+    def start(self, engine):
+        super().start(engine)
+        self.solver = DeductionSolver(decoy_clues=self.decoys)
+        self.looked_up, self.visited = set(), set()
+
+    def next_action(self):
+        if self.certainty is not None and self.solver.best_guess()[1] >= self.certainty:
+            return None
+        kind, i = detective_action(self.solver, self.looked_up, self.visited)
+        names = {"suspect": SUSPECTS, "weapon": WEAPONS, "area": AREAS}[kind]
+        return kind, names[i]
+
+    def observe(self, kind, name, revealed):
+        if kind == "area":
+            self.visited.add(AREA_IDS[name])
+            for clue in revealed:
+                self.solver.observe(clue)
+        elif kind == "suspect":
+            self.looked_up.add((kind, SUSPECT_IDS[name]))
+            self.solver.observe_lookup(True, SUSPECT_IDS[name], revealed)
+        else:
+            self.looked_up.add((kind, WEAPON_IDS[name]))
+            self.solver.observe_lookup(False, WEAPON_IDS[name], revealed)
+
+    def accusation(self):
+        (s, w, a), _ = self.solver.best_guess()
+        return SUSPECTS[s], WEAPONS[w], AREAS[a]
+
+STRATEGIES = {cls.name: cls for cls in (RandomStrategy, AreaGreedyStrategy, SuspectFirstStrategy,
+                                        SolverStrategy)}
+
+def play_game(strategy, engine):
+    # Juega la partida ya cargada en engine y devuelve el resultado de la acusación.
+    enter = {"area": engine.enter_area, "suspect": engine.enter_suspect, "weapon": engine.enter_weapon}
+    strategy.start(engine)
+    while not engine.out_of_turns():
+        action = strategy.next_action()
+        if action is None:
+            break
+        kind, name = action
+        strategy.observe(kind, name, enter[kind](name))
+    return engine.make_accusation(*strategy.accusation())
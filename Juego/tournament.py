@@ -0,0 +1,151 @@
+import argparse
+import math
+import time
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+
+from engine import DECOY_CLUES, CLUES_PER_AREA_VISIT, ClueDeck, Case, ClueEngine, generate_case, new_master_seed
+from strategies import STRATEGIES, play_game
+
+# ========================
+# TORNEO DE ESTRATEGIAS
+# Enfrenta estrategias (strategies.py) sobre exactamente los mismos casos: cada
+# participante es (estrategia, nº de pistas falsas, pistas por visita a un área), así que
+# también sirve para medir cómo cambia el balance al tocar generate_clues o enter_area.
+#
+# Los casos se reparten por bloques en un pool de procesos; cada trabajador escribe el
+# resultado de cada partida en un bloque de memoria compartida (un byte por partida y
+# participante: bit 0 = victoria, bits 1-7 = turnos usados), sin devolverlo por la cola.
+#
+# El informe da la tasa de victoria con su intervalo de Wilson al 95 % y compara cada
+# participante con el primero mediante la prueba de McNemar (pareada: mismos casos).
+# ========================
+
+Z_95 = 1.959963984540054
+
+# Memoria compartida del trabajador (se abre una vez por proceso).
+_results = None
+
+def _attach(name):
+    global _results
+    _results = SharedMemory(name=name)
+
+def play_block(args):
+    master_seed, entrants, games, first, count = args
+    players = []
+    for strategy, decoys, per_visit in entrants:
+        engine = ClueEngine(master_seed=master_seed, clues_per_visit=per_visit)
+        players.append((STRATEGIES[strategy](decoys=decoys), engine, decoys))
+    buf = _results.buf
+    for case_id in range(first, first + count):
+        # Un caso por número de pistas falsas; cada participante juega su propia copia del mazo.
+        cases = {}
+        for e, (strategy, engine, decoys) in enumerate(players):
+            base = cases.get(decoys)
+            if base is None:
+                base = cases[decoys] = generate_case(master_seed, case_id, decoys)
+            deck = ClueDeck(base.clues.codes, base.clues.area_start, base.clues.pack)
+            engine.load_case(Case(base.master_seed, base.case_id, base.culprit, base.weapon,
+                                  base.location, deck))
+            result = play_game(strategy, engine)
+            buf[e * games + case_id] = int(result["correct"]) | engine.turns << 1
+    return count
+
+# ========================
+# ESTADÍSTICA
+# ========================
+
+def wilson(wins, n, z=Z_95):
+    # Intervalo de confianza de Wilson para una proporción.
+    if n == 0:
+        return 0.0, 1.0
+    p = wins / n
+    center = (p + z * z / (2 * n)) / (1 + z * z / n)
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return center - half, center + half
+
+def mcnemar(b, c):
+    # p-valor bilateral de McNemar: b y c son los casos discordantes (solo gana uno u otro).
+    # Con pocos casos se usa la binomial exacta; si no, chi-cuadrado con corrección.
+    n = b + c
+    if n == 0:
+        return 1.0
+    if n < 50:
+        tail = sum(math.comb(n, k) for k in range(min(b, c) + 1)) / 2 ** n
+        return min(1.0, 2 * tail)
+    chi2 = (abs(b - c) - 1) ** 2 / n
+    return math.erfc(math.sqrt(chi2 / 2))
+
+# ========================
+# EJECUCIÓN
+# ========================
+
+def run_tournament(entrants, games, seed=None, workers=None, chunk_size=2000):
+    # Devuelve (semilla, bytes de resultados, segundos); resultados[e * games + caso].
+    if seed is None:
+        seed = new_master_seed()
+    shm = SharedMemory(create=True, size=max(1, len(entrants) * games))
+    try:
+        blocks = [(seed, entrants, games, first, min(chunk_size, games - first))
+                  for first in range(0, games, chunk_size)]
+        start = time.perf_counter()
+        with Pool(workers, initializer=_attach, initargs=(shm.name,)) as pool:
+            for _ in pool.imap_unordered(play_block, blocks):
+                pass
+        elapsed = time.perf_counter() - start
+        results = bytes(shm.buf[:len(entrants) * games])
+    finally:
+        shm.close()
+        shm.unlink()
+    return seed, results, elapsed
+
+def report(entrants, games, results):
+    print(f"{'participante':<34} {'victorias':>9}   {'IC 95%':^17} {'turnos':>6}")
+    rows = [results[e * games:(e + 1) * games] for e in range(len(entrants))]
+    for (strategy, decoys, per_visit), row in zip(entrants, rows):
+        wins = sum(r & 1 for r in row)
+        lo, hi = wilson(wins, games)
+        turns = sum(r >> 1 for r in row) / games
+        label = f"{strategy} (falsas={decoys}, visita={per_visit})"
+        print(f"{label:<34} {wins / games:>9.2%}   [{lo:6.2%}, {hi:6.2%}] {turns:>6.2f}")
+
+    if len(entrants) > 1:
+        print(f"\nComparación con {entrants[0][0]} (McNemar, mismos casos):")
+        base = rows[0]
+        for (strategy, decoys, per_visit), row in zip(entrants[1:], rows[1:]):
+            b = sum(1 for x, y in zip(base, row) if x & 1 and not y & 1)
+            c = sum(1 for x, y in zip(base, row) if y & 1 and not x & 1)
+            p = mcnemar(b, c)
+            verdict = "significativa" if p < 0.05 else "no significativa"
+            label = f"{strategy} (falsas={decoys}, visita={per_visit})"
+            print(f"  {label:<34} solo base {b:>7}  solo este {c:>7}  p = {p:.3g} ({verdict})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Torneo de estrategias sobre los mismos casos")
+    parser.add_argument("-p", "--strategies", default=",".join(STRATEGIES),
+                        help=f"estrategias separadas por comas ({', '.join(STRATEGIES)})")
+    parser.add_argument("--decoys", type=int, nargs="+", default=[DECOY_CLUES],
+                        help="número de pistas falsas por caso (se prueba cada valor)")
+    parser.add_argument("--per-visit", type=int, nargs="+", default=[CLUES_PER_AREA_VISIT],
+                        help="pistas reveladas por visita a un área (se prueba cada valor)")
+    parser.add_argument("-n", "--games", type=int, default=100000, help="casos por participante")
+    parser.add_argument("-s", "--seed", type=int, default=None, help="semilla maestra")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="procesos")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="casos por bloque de trabajo")
+    args = parser.parse_args()
+
+    names = args.strategies.split(",")
+    unknown = [n for n in names if n not in STRATEGIES]
+    if unknown:
+        parser.error(f"estrategias desconocidas: {', '.join(unknown)}")
+    entrants = [(name, decoys, per_visit) for name in names
+                for decoys in args.decoys for per_visit in args.per_visit]
+
+    seed, results, elapsed = run_tournament(entrants, args.games, args.seed, args.workers,
+                                            args.chunk_size)
+    print(f"Semilla maestra: {seed}")
+    print(f"{args.games} casos × {len(entrants)} participantes en {elapsed:.1f} s\n")
+    report(entrants, args.games, results)
+
+if __name__ == "__main__":
+    main()
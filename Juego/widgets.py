@@ -0,0 +1,119 @@
+import tkinter as tk
+from tkinter import ttk
+
+# ========================
+# VISTA DE REGISTRO DE PISTAS
+# Muestra un registro que solo crece (engine.ClueLog o cualquier secuencia con len y
+# cortes) sin redibujarlo entero cada vez:
+#   - Modo normal: se recuerda cuántas entradas hay ya en el Text y solo se añade lo nuevo.
+#   - Modo virtual: a partir de VIRTUAL_THRESHOLD entradas (por ejemplo, al repasar una
+#     partida archivada con miles de pistas) el Text solo contiene las filas visibles,
+#     una entrada por fila, y la barra de desplazamiento decide qué ventana se dibuja.
+#     Desplazarse cuesta O(filas visibles), no O(entradas).
+# ========================
+
+VIRTUAL_THRESHOLD = 500
+WHEEL_ROWS = 3
+
+class ClueLogView(tk.Frame):
+    def __init__(self, master, format_entry, empty_text, height=15, **text_options):
+        super().__init__(master, bg=text_options.get("bg"))
+        self.format_entry = format_entry
+        self.empty_text = empty_text
+        self.rows = height
+        self.wrap = text_options.pop("wrap", "word")
+
+        self.text = tk.Text(self, height=height, wrap=self.wrap, **text_options)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical")
+        self.scrollbar.pack(side="right", fill="y")
+        self.text.pack(side="left", fill="both", expand=True)
+        self.text.bind("<MouseWheel>", self.on_wheel)
+
+        self.log = None
+        self.shown = 0       # entradas ya escritas en el Text (modo normal)
+        self.virtual = False
+        self.first = 0       # primera entrada visible (modo virtual)
+
+    def show(self, log):
+        # Muestra el registro: si es el mismo que antes, solo añade lo nuevo.
+        if log is self.log:
+            self.sync()
+        else:
+            self.attach(log)
+
+    def attach(self, log):
+        self.log = log
+        self.shown = 0
+        self.first = 0
+        self.virtual = False
+        self.text.configure(wrap=self.wrap, yscrollcommand=self.scrollbar.set)
+        self.scrollbar.configure(command=self.text.yview)
+        self._replace("")
+        self.sync()
+
+    def sync(self):
+        n = len(self.log)
+        if self.virtual:
+            self._render_window(n)
+            return
+        if n > VIRTUAL_THRESHOLD:
+            self._enter_virtual(n)
+            return
+        if n == 0:
+            self._replace(self.empty_text)
+            return
+        if n == self.shown:
+            return
+        delta = "".join(self.format_entry(e) + "\n" for e in self.log[self.shown:])
+        self.text.config(state="normal")
+        if self.shown == 0:
+            self.text.delete("1.0", "end")  # quita el texto de "sin pistas"
+        self.text.insert("end", delta)
+        self.text.config(state="disabled")
+        self.shown = n
+
+    # ========================
+    # MODO VIRTUAL
+    # ========================
+
+    def _enter_virtual(self, n):
+        self.virtual = True
+        self.text.configure(wrap="none", yscrollcommand="")
+        self.scrollbar.configure(command=self.on_scroll)
+        self.first = max(0, n - self.rows)
+        self._render_window(n)
+
+    def _render_window(self, n, follow=True):
+        # follow: si la vista estaba al final, se mantiene al final al llegar entradas nuevas.
+        last_first = max(0, n - self.rows)
+        if follow and self.first + self.rows >= self.shown:
+            self.first = last_first
+        self.first = min(max(self.first, 0), last_first)
+        window = self.log[self.first:self.first + self.rows]
+        self._replace("\n".join(self.format_entry(e) for e in window))
+        self.scrollbar.set(self.first / n, min(1.0, (self.first + self.rows) / n))
+        self.shown = n
+
+    def on_scroll(self, *args):
+        # Mismos argumentos que recibe yview: ("moveto", fracción) o ("scroll", n, unidad).
+        n = len(self.log)
+        if args[0] == "moveto":
+            self.first = int(float(args[1]) * n)
+        else:
+            step = self.rows if args[2] == "pages" else 1
+            self.first += int(args[1]) * step
+        self._render_window(n, follow=False)
+
+    def on_wheel(self, event):
+        # En modo normal la rueda funciona como siempre; en modo virtual mueve la ventana
+        # y no deja que el evento llegue al desplazamiento general.
+        if not self.virtual:
+            return None
+        self.on_scroll("scroll", int(-event.delta / 120) * WHEEL_ROWS, "units")
+        return "break"
+
+    def _replace(self, content):
+        self.text.config(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("end", content)
+        self.text.config(state="disabled")